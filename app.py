@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+from collections import OrderedDict
 from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
@@ -13,6 +15,10 @@ import requests
 import streamlit as st
 
 API_BASE_URL = os.environ.get("ELECTIONS_API_URL", "http://127.0.0.1:8000")
+# Responses remembered for conditional requests, least recently used dropped first.
+ETAG_CACHE_ENTRIES = int(os.environ.get("ELECTIONS_ETAG_CACHE_ENTRIES", "256"))
+# Free-text endpoints: nearly every URL is new, so caching them only evicts the rest.
+UNCACHED_PATHS = {"/search", "/search/fuzzy"}
 INDIA_GEOJSON_URL = (
     "https://raw.githubusercontent.com/geohacker/india/master/district/india_district.geojson"
 )
@@ -25,16 +31,63 @@ def fetch_geojson() -> dict:
     return response.json()
 
 
+@st.cache_resource
+def http_session() -> requests.Session:
+    return requests.Session()
+
+
+class ETagStore:
+    """Last ETag and decoded body per request URL, capped at ``max_entries`` (LRU)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[str, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Tuple[str, object]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, etag: str, body: object) -> None:
+        with self._lock:
+            self._entries[url] = (etag, body)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def etag_store() -> ETagStore:
+    """Shared by every session and kept across reruns."""
+    return ETagStore(ETAG_CACHE_ENTRIES)
+
+
 def api_get(path: str, params: Optional[List[Tuple[str, str]]] = None) -> list | dict:
-    url = f"{API_BASE_URL}{path}"
-    response = requests.get(url, params=params, timeout=30)
+    url = requests.Request("GET", f"{API_BASE_URL}{path}", params=params).prepare().url
+    store = etag_store() if path not in UNCACHED_PATHS else None
+    cached = store.get(url) if store else None
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    response = http_session().get(url, headers=headers, timeout=30)
+    if response.status_code == 304 and cached:
+        return cached[1]
     response.raise_for_status()
-    return response.json()
+    body = response.json()
+    if store and "ETag" in response.headers:
+        store.put(url, response.headers["ETag"], body)
+    return body
 
 
 @st.cache_data(ttl=600)
-def get_filters() -> dict:
-    return api_get("/filters")
+def get_filters(state: Optional[str] = None, year: Optional[int] = None) -> dict:
+    params: List[Tuple[str, str]] = []
+    if state:
+        params.append(("state", state))
+    if year:
+        params.append(("year", str(year)))
+    return api_get("/filters", params)
 
 
 def build_params(filters: Dict) -> List[Tuple[str, str]]:
@@ -52,41 +105,6 @@ def build_params(filters: Dict) -> List[Tuple[str, str]]:
     return params
 
 
-@st.cache_data(ttl=600)
-def get_party_seat_share(filters: Dict):
-    params = build_params(filters)
-    return api_get("/party-seat-share", params)
-
-
-@st.cache_data(ttl=600)
-def get_state_turnout(filters: Dict):
-    params = build_params(filters)
-    return api_get("/state-turnout", params)
-
-
-@st.cache_data(ttl=600)
-def get_gender_representation(filters: Dict):
-    params = []
-    if filters.get("year"):
-        params.append(("year", str(filters["year"])))
-    return api_get("/gender-representation", params)
-
-
-@st.cache_data(ttl=600)
-def get_top_vote_share(filters: Dict, limit: int = 5):
-    params = []
-    if filters.get("year"):
-        params.append(("year", str(filters["year"])))
-    params.append(("limit", str(limit)))
-    return api_get("/top-vote-share", params)
-
-
-@st.cache_data(ttl=600)
-def get_margin_distribution(filters: Dict):
-    params = build_params(filters)
-    return api_get("/margin-distribution", params)
-
-
 def search_candidates(query: str, filters: Dict):
     params = build_params(filters)
     params.append(("query", query))
@@ -94,16 +112,11 @@ def search_candidates(query: str, filters: Dict):
 
 
 @st.cache_data(ttl=600)
-def get_analytics():
-    results = {
-        "turnout": api_get("/analytics/highest-turnout"),
-        "seat_change": api_get("/analytics/seat-change"),
-        "women": api_get("/analytics/women-participation"),
-        "close_margins": api_get("/analytics/close-margins"),
-        "vote_trend": api_get("/analytics/vote-share-trend"),
-        "education": api_get("/analytics/education-win-rate"),
-    }
-    return results
+def get_dashboard(filters: Dict, limit: int = 5):
+    """All chart panels and analytics for ``filters`` in one request."""
+    params = build_params(filters)
+    params.append(("limit", str(limit)))
+    return api_get("/dashboard", params)
 
 
 def render_seat_share(data: List[dict]):
@@ -186,18 +199,21 @@ def render_vote_share_donut(data: List[dict]):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def render_margin_histogram(data: List[dict]):
-    if not data:
+def render_margin_histogram(bins: List[dict]):
+    if not bins:
         st.info("No margin data.")
         return
-    df = pd.DataFrame(data)
-    fig = px.histogram(
+    df = pd.DataFrame(bins)
+    df["margin"] = (df["lower"] + df["upper"]) / 2
+    fig = px.bar(
         df,
         x="margin",
-        nbins=30,
+        y="count",
         title="Distribution of Victory Margins",
-        labels={"margin": "Margin (votes)"},
+        labels={"margin": "Margin (votes)", "count": "Seats"},
     )
+    fig.update_traces(width=df["upper"] - df["lower"])
+    fig.update_layout(bargap=0)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -228,24 +244,26 @@ def render_search(filters: Dict):
     st.dataframe(df, use_container_width=True, hide_index=True)
 
 
-def render_analytics():
-    data = get_analytics()
+def render_analytics(data: Dict):
     st.subheader("Analytical Highlights")
     col1, col2, col3 = st.columns(3)
-    turnout = data["turnout"]
-    col1.metric(
-        "Highest Turnout (2019)",
-        f"{turnout['state_name']}",
-        f"{turnout['turnout_pct']:.2f}%",
-    )
+    turnout = data["highest_turnout"]
+    if turnout:
+        col1.metric(
+            "Highest Turnout (2019)",
+            f"{turnout['state_name']}",
+            f"{turnout['turnout_pct']:.2f}%",
+        )
     seat_change = data["seat_change"]
-    col2.metric(
-        "Biggest Seat Swing",
-        f"{seat_change['party']} ({seat_change['year']})",
-        f"{seat_change['seat_change']:+}",
-    )
+    if seat_change:
+        col2.metric(
+            "Biggest Seat Swing",
+            f"{seat_change['party']} ({seat_change['year']})",
+            f"{seat_change['seat_change']:+}",
+        )
     women = data["women"]
-    col3.metric("Women Participation", f"{women['percentage']:.2f}%")
+    if women:
+        col3.metric("Women Participation", f"{women['percentage']:.2f}%")
 
     st.markdown("#### Closest Contests")
     st.table(pd.DataFrame(data["close_margins"]))
@@ -272,16 +290,20 @@ def main():
     sidebar.header("Filters")
 
     selected_year = sidebar.selectbox("Year", options=filters["years"], index=len(filters["years"]) - 1)
-    selected_state = sidebar.selectbox("State/UT", options=["All"] + filters["states"])
+    # Each choice narrows the next: states contested that year, then the parties
+    # and constituencies of that state and year.
+    year_filters = get_filters(year=selected_year)
+    selected_state = sidebar.selectbox("State/UT", options=["All"] + year_filters["states"])
+    scoped = year_filters if selected_state == "All" else get_filters(selected_state, selected_year)
     selected_gender = sidebar.selectbox("Gender", options=["All"] + filters["genders"])
     selected_parties = sidebar.multiselect(
         "Parties",
-        options=filters["parties"],
+        options=scoped["parties"],
         default=[],
         help="Select parties to highlight seat share",
     )
     selected_constituency = sidebar.selectbox(
-        "Constituency", options=["All"] + filters["constituencies"], index=0
+        "Constituency", options=["All"] + scoped["constituencies"], index=0
     )
 
     active_filters = {
@@ -292,25 +314,27 @@ def main():
         "constituency": None if selected_constituency == "All" else selected_constituency,
     }
 
+    dashboard = get_dashboard(active_filters)
+
     col_a, col_b = st.columns(2)
     with col_a:
-        render_seat_share(get_party_seat_share(active_filters))
+        render_seat_share(dashboard["seat_share"])
     with col_b:
-        render_turnout_map(get_state_turnout(active_filters))
+        render_turnout_map(dashboard["state_turnout"])
 
     col_c, col_d = st.columns(2)
     with col_c:
-        render_gender_trend(get_gender_representation(active_filters))
+        render_gender_trend(dashboard["gender_representation"])
     with col_d:
-        render_vote_share_donut(get_top_vote_share(active_filters))
+        render_vote_share_donut(dashboard["top_vote_share"])
 
     col_e, col_f = st.columns(2)
     with col_e:
-        render_margin_histogram(get_margin_distribution(active_filters))
+        render_margin_histogram(dashboard["margin_histogram"])
     with col_f:
         render_search(active_filters)
 
-    render_analytics()
+    render_analytics(dashboard)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from .config import CACHE_CHECK_SECONDS, CACHE_MAX_ENTRIES
+from .database import ReadOnlySession
+from . import metrics
+
+
+def _freeze(value: Any) -> Hashable:
+    # Multi-value filters are order-insensitive, and one value is the scalar filter;
+    # tuples (page cursors) are positional.
+    if isinstance(value, (list, set, frozenset)):
+        items = sorted(set(value))
+        return items[0] if len(items) == 1 else tuple(items)
+    return value
+
+
+class QueryCache:
+    """Size-bounded LRU of query results, dropped whenever the load generation changes.
+
+    The generation is the stamp ``load_data.py`` writes to ``load_metadata``; it is
+    re-read at most every ``check_seconds``, so a reload shows up within that window.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, check_seconds: float = CACHE_CHECK_SECONDS):
+        self.max_entries = max_entries
+        self.check_seconds = check_seconds
+        self.generation: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _read_generation(self, db: Session) -> Optional[str]:
+        try:
+            return db.execute(
+                text("SELECT value FROM load_metadata WHERE key = 'generation'")
+            ).scalar()
+        except OperationalError:
+            return None
+
+    def _sync(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_seconds:
+            return
+        generation = self._read_generation(db)
+        with self._lock:
+            self._checked_at = now
+            if generation != self.generation:
+                self.generation = generation
+                self._entries.clear()
+
+    def current_generation(self) -> Optional[str]:
+        """Return the load generation, re-reading it through a short session when stale."""
+        if time.monotonic() - self._checked_at >= self.check_seconds:
+            with ReadOnlySession() as db:
+                self._sync(db)
+        return self.generation
+
+    def get_or_compute(self, key: Hashable, db: Session, compute: Callable[[], Any]) -> Any:
+        if self.max_entries <= 0:
+            return compute()
+        self._sync(db)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            generation = self.generation
+        value = compute()
+        with self._lock:
+            # Skip the store if a reload was noticed while computing.
+            if generation == self.generation:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = float("-inf")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "generation": self.generation,
+            }
+
+
+query_cache = QueryCache()
+
+
+def cached(func: Callable) -> Callable:
+    """Serve ``func(db, ...)`` from ``query_cache``, keyed on its normalised arguments."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(db: Session, *args, **kwargs):
+        bound = signature.bind(db, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + tuple(
+            (name, _freeze(value)) for name, value in bound.arguments.items() if name != "db"
+        )
+        computed = False
+
+        def compute():
+            nonlocal computed
+            computed = True
+            value = func(db, *args, **kwargs)
+            if isinstance(value, list):
+                metrics.query_rows.observe((func.__name__,), len(value))
+            return value
+
+        token = metrics.current_query.set(func.__name__)
+        try:
+            value = query_cache.get_or_compute(key, db, compute)
+        finally:
+            metrics.current_query.reset(token)
+        metrics.query_calls.inc((func.__name__, "miss" if computed else "hit"))
+        return value
+
+    return wrapper
@@ -0,0 +1,468 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .cache import cached, query_cache
+from .filters import IntFilter, StrFilter, values
+from .pagination import SortKey
+from .queries import (  # noqa: F401 - served by SQL under either engine
+    MARGIN_KEY,
+    SEAT_SHARE_KEY,
+    SEARCH_MIN_CHARS,
+    TURNOUT_KEY,
+    biggest_seat_change,
+    candidates_by_rowid,
+    get_filters,
+    search_candidates,
+    top_gainers,
+    top_losers,
+)
+
+# Same classification as queries.vote_share_trend (LIKE is case-insensitive).
+_CATEGORY_SQL = (
+    "CASE WHEN party_type LIKE '%National%' THEN 'National' "
+    "WHEN party_type LIKE '%State%' THEN 'Regional' ELSE 'Other' END"
+)
+_CANDIDATES_SQL = f"""
+    SELECT year, state_key, constituency_key, party_key, education_key, gender,
+           is_winner = 1 AS is_winner, candidate_name IS NOT NULL AS named, votes,
+           turnout_pct, electors, valid_votes, {_CATEGORY_SQL} AS category
+    FROM candidates
+    ORDER BY rowid
+"""
+_MARGINS_SQL = (
+    "SELECT rowid AS row_id, year, state_key, constituency_key, party_key, margin FROM victory_margins"
+)
+_DIMENSIONS = {
+    "state": ("dim_state", "state_key", "state_name"),
+    "party": ("dim_party", "party_key", "party"),
+    "constituency": ("dim_constituency", "constituency_key", "constituency_name"),
+    "education": ("dim_education", "education_key", "education"),
+}
+EDUCATION_MIN_CANDIDATES = 50
+EDUCATION_TOP = 10
+
+
+class _Dimension:
+    """Names indexed by key, and keys by name."""
+
+    def __init__(self, rows: Sequence[Tuple[int, str]]):
+        size = max((key for key, _ in rows), default=-1) + 1
+        self.names = np.empty(size, dtype=object)
+        for key, name in rows:
+            self.names[key] = name
+        self.keys = {name: key for key, name in rows}
+
+    def key(self, name: str) -> int:
+        return self.keys.get(name, -1)
+
+    def key_list(self, names: Sequence[str]) -> List[int]:
+        return [self.key(name) for name in names]
+
+
+def _floats(series: pd.Series) -> np.ndarray:
+    return pd.to_numeric(series).to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _codes(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Dictionary-encode ``series``: codes (-1 for NULL) into its sorted distinct values."""
+    codes, labels = pd.factorize(series, sort=True)
+    return codes.astype(np.int64), np.asarray(labels, dtype=object)
+
+
+def _sort_order(columns: Dict[str, np.ndarray], key: SortKey) -> np.ndarray:
+    """Row order of ``columns`` under ``key`` with SQLite's NULLs-first ascending rule."""
+    arrays = []
+    for _, column, desc in key:
+        array = columns[column]
+        if array.dtype == object:
+            array = np.unique(array, return_inverse=True)[1]
+        elif array.dtype.kind == "f":
+            array = np.where(np.isnan(array), -np.inf, array)
+        arrays.append(-array if desc else array)
+    return np.lexsort(arrays[::-1])
+
+
+def _after_mask(columns: Dict[str, np.ndarray], key: SortKey, after: Sequence[Any]) -> np.ndarray:
+    """Rows strictly after ``after`` in ``key`` order, as ``pagination.after_filter`` selects.
+
+    NULL values compare false against a value; a NULL in ``after`` is followed by the
+    non-NULL values ascending and by nothing descending.
+    """
+    size = len(next(iter(columns.values())))
+    later = np.zeros(size, dtype=bool)
+    tied = np.ones(size, dtype=bool)
+    for (_, column, desc), value in zip(key, after):
+        array = columns[column]
+        if value is None:
+            missing = pd.isna(array)
+            if not desc:
+                later |= tied & ~missing
+            tied &= missing
+            continue
+        later |= tied & ((array < value) if desc else (array > value))
+        tied &= array == value
+    return later
+
+
+def _rows(
+    columns: Dict[str, np.ndarray], order: np.ndarray, ints: Sequence[str] = ()
+) -> List[Dict[str, Any]]:
+    """Plain dicts for ``columns`` taken in ``order``; ``ints`` are floats holding nullable integers."""
+    lists = []
+    for name, column in columns.items():
+        taken = column[order]
+        if name in ints:
+            lists.append([None if np.isnan(value) else int(value) for value in taken])
+        else:
+            lists.append(taken.tolist())
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*lists)]
+
+
+def _page(
+    columns: Dict[str, np.ndarray],
+    key: SortKey,
+    limit: Optional[int],
+    after: Optional[Sequence[Any]],
+    order: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Like the keyset-paginated SQL: indices of the rows after ``after``, up to ``limit + 1``.
+
+    ``order`` is the candidate rows already in ``key`` order; otherwise all rows are sorted.
+    """
+    if order is None:
+        order = _sort_order(columns, key)
+    if after:
+        order = order[_after_mask(columns, key, after)[order]]
+    return order[: limit + 1] if limit else order
+
+
+class ColumnarStore:
+    """The ``candidates`` and ``victory_margins`` columns as NumPy arrays.
+
+    Keys stay integer codes and strings are dictionary-encoded, so filters are
+    vectorised comparisons and group-bys are ``np.bincount`` over a combined key.
+    The small aggregates SQL reads from loader tables (turnout, votes per party and
+    year, candidates per gender and year) are computed once here, and margins and
+    turnout are kept sorted in their pagination order.
+    """
+
+    def __init__(
+        self,
+        candidates: pd.DataFrame,
+        margins: pd.DataFrame,
+        dimensions: Dict[str, _Dimension],
+        generation: Optional[str] = None,
+    ):
+        self.generation = generation
+        self.dims = dimensions
+        self.years = np.unique(candidates["year"].to_numpy(dtype=np.int64))
+        self.year = candidates["year"].to_numpy(dtype=np.int64)
+        self.year_code = np.searchsorted(self.years, self.year)
+        self.state_key = candidates["state_key"].to_numpy(dtype=np.int64)
+        self.constituency_key = candidates["constituency_key"].to_numpy(dtype=np.int64)
+        self.party_key = candidates["party_key"].to_numpy(dtype=np.int64)
+        self.education_key = candidates["education_key"].fillna(-1).to_numpy(dtype=np.int64)
+        self.gender, self.genders = _codes(candidates["gender"])
+        self.category, self.categories = _codes(candidates["category"])
+        self.is_winner = candidates["is_winner"].to_numpy(dtype=bool)
+        self.named = candidates["named"].to_numpy(dtype=bool)
+        # SUM ignores NULL votes; zero adds the same.
+        self.votes = np.nan_to_num(_floats(candidates["votes"]))
+        self._genders()
+        self._party_votes()
+        self._turnout(candidates)
+        self._margins(margins)
+
+    def _sizes(self, *dims: str) -> Tuple[int, ...]:
+        return tuple(len(self.dims[name].names) for name in dims)
+
+    def _genders(self) -> None:
+        # Small enough to keep whole, in (year, gender) order; NULL genders are not counted.
+        known = self.gender >= 0
+        genders = len(self.genders)
+        groups = self.year_code[known] * genders + self.gender[known]
+        size = len(self.years) * genders
+        present = np.flatnonzero(np.bincount(groups, minlength=size))
+        named = np.bincount(groups, weights=self.named[known], minlength=size)
+        winners = np.bincount(groups, weights=self.is_winner[known], minlength=size)
+        year_code, gender = np.divmod(present, genders)
+        self.gender_counts = {
+            "year": self.years[year_code],
+            "gender": self.genders[gender],
+            "total_candidates": named[present].astype(np.int64),
+            "total_winners": winners[present].astype(np.int64),
+        }
+
+    def _party_votes(self) -> None:
+        # Votes and candidate counts per (year, party), as party_vote_share holds them.
+        (parties,) = self._sizes("party")
+        shape = (len(self.years), parties)
+        groups = self.year_code * parties + self.party_key
+        size = shape[0] * parties
+        self.party_candidates = np.bincount(groups, minlength=size).reshape(shape)
+        self.party_votes = np.bincount(groups, weights=self.votes, minlength=size).reshape(shape)
+
+    def _turnout(self, candidates: pd.DataFrame) -> None:
+        # As the loader: the first row per constituency, then a mean per (year, state).
+        states, constituencies = self._sizes("state", "constituency")
+        seats = np.ravel_multi_index(
+            (self.year_code, self.state_key, self.constituency_key),
+            (len(self.years), states, constituencies),
+        )
+        first = np.sort(np.unique(seats, return_index=True)[1])
+        groups = self.year_code[first] * states + self.state_key[first]
+        size = len(self.years) * states
+        counts = np.bincount(groups, minlength=size)
+        present = np.flatnonzero(counts)
+
+        def total(column: str) -> np.ndarray:
+            weights = np.nan_to_num(_floats(candidates[column]))[first]
+            return np.bincount(groups, weights=weights, minlength=size)[present]
+
+        year_code, state_key = np.divmod(present, states)
+        columns = {
+            "year": self.years[year_code],
+            "state_name": self.dims["state"].names[state_key],
+            # pandas' mean, as the loader's, so the values match to the last bit.
+            "turnout_pct": pd.Series(_floats(candidates["turnout_pct"])[first])
+            .groupby(groups)
+            .mean()
+            .to_numpy(),
+            "electors": total("electors").astype(np.int64),
+            "valid_votes": total("valid_votes").astype(np.int64),
+        }
+        order = _sort_order(columns, TURNOUT_KEY)
+        self.turnout = {name: column[order] for name, column in columns.items()}
+
+    def _margins(self, margins: pd.DataFrame) -> None:
+        columns = {
+            name: margins[name].to_numpy(dtype=np.int64)
+            for name in ("year", "state_key", "constituency_key", "party_key", "row_id")
+        }
+        columns["margin"] = _floats(margins["margin"])
+        order = _sort_order(columns, MARGIN_KEY)
+        self.margins = {name: column[order] for name, column in columns.items()}
+
+    @classmethod
+    def from_database(cls, db: Session, generation: Optional[str] = None) -> "ColumnarStore":
+        dimensions = {
+            name: _Dimension(db.execute(text(f"SELECT {key}, {column} FROM {table}")).all())
+            for name, (table, key, column) in _DIMENSIONS.items()
+        }
+        result = db.execute(text(_CANDIDATES_SQL))
+        candidates = pd.DataFrame(result.all(), columns=list(result.keys()))
+        result = db.execute(text(_MARGINS_SQL))
+        margins = pd.DataFrame(result.all(), columns=list(result.keys()))
+        return cls(candidates, margins, dimensions, generation)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [value for value in vars(self).values() if isinstance(value, np.ndarray)]
+        for table in (self.gender_counts, self.turnout, self.margins):
+            arrays += table.values()
+        return sum(array.nbytes for array in arrays)
+
+    def gender_code(self, gender: str) -> int:
+        matches = np.flatnonzero(self.genders == gender)
+        return int(matches[0]) if len(matches) else -2
+
+
+def _filter(mask: np.ndarray, column: np.ndarray, value: Any, encode=None) -> None:
+    """Narrow ``mask`` to rows whose ``column`` holds ``value``, or one of several values."""
+    items = values(value)
+    if items:
+        mask &= np.isin(column, encode(items) if encode else items)
+
+
+_lock = threading.Lock()
+_store: Optional[ColumnarStore] = None
+
+
+def columnar_store(db: Session) -> ColumnarStore:
+    """The store for the current load generation, rebuilt after a reload."""
+    global _store
+    generation = query_cache.current_generation()
+    with _lock:
+        if _store is None or _store.generation != generation:
+            _store = ColumnarStore.from_database(db, generation)
+        return _store
+
+
+@cached
+def party_seat_share(
+    db: Session,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    parties: StrFilter = None,
+    gender: StrFilter = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, ...]] = None,
+):
+    store = columnar_store(db)
+    mask = store.is_winner.copy()
+    _filter(mask, store.year, year)
+    _filter(mask, store.state_key, state, store.dims["state"].key_list)
+    _filter(mask, store.party_key, parties, store.dims["party"].key_list)
+    _filter(mask, store.gender, gender, lambda genders: [store.gender_code(g) for g in genders])
+    shape = (len(store.years), *store._sizes("party", "state"))
+    groups = np.ravel_multi_index(
+        (store.year_code[mask], store.party_key[mask], store.state_key[mask]), shape
+    )
+    seats = np.bincount(groups, minlength=int(np.prod(shape)))
+    present = np.flatnonzero(seats)
+    year_code, party_key, state_key = np.unravel_index(present, shape)
+    columns = {
+        "year": store.years[year_code],
+        "party": store.dims["party"].names[party_key],
+        "state_name": store.dims["state"].names[state_key],
+        "seats": seats[present],
+        "party_key": party_key,
+        "state_key": state_key,
+    }
+    return _rows(columns, _page(columns, SEAT_SHARE_KEY, limit, after))
+
+
+@cached
+def state_turnout(
+    db: Session,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, ...]] = None,
+):
+    turnout = columnar_store(db).turnout
+    mask = np.ones(len(turnout["year"]), dtype=bool)
+    _filter(mask, turnout["year"], year)
+    _filter(mask, turnout["state_name"], state)
+    return _rows(turnout, _page(turnout, TURNOUT_KEY, limit, after, np.flatnonzero(mask)))
+
+
+@cached
+def gender_representation(db: Session, year: IntFilter = None):
+    genders = columnar_store(db).gender_counts
+    mask = np.ones(len(genders["year"]), dtype=bool)
+    _filter(mask, genders["year"], year)
+    return _rows(genders, np.flatnonzero(mask))
+
+
+@cached
+def top_vote_share(db: Session, year: int, limit: int = 5):
+    store = columnar_store(db)
+    year_code = int(np.searchsorted(store.years, year))
+    if year_code == len(store.years) or store.years[year_code] != year:
+        return []
+    present = np.flatnonzero(store.party_candidates[year_code])
+    votes = store.party_votes[year_code, present]
+    total = votes.sum()
+    columns = {
+        "party": store.dims["party"].names[present],
+        "year": np.full(len(present), year, dtype=np.int64),
+        "total_votes": votes.astype(np.int64),
+        "vote_pct": votes * 100.0 / total if total else np.full(len(present), None, dtype=object),
+    }
+    order = np.lexsort((present, -votes))[:limit]
+    return _rows(columns, order)
+
+
+@cached
+def margin_distribution(
+    db: Session,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    constituency: StrFilter = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, ...]] = None,
+):
+    store = columnar_store(db)
+    margins = store.margins
+    mask = np.ones(len(margins["year"]), dtype=bool)
+    _filter(mask, margins["year"], year)
+    _filter(mask, margins["state_key"], state, store.dims["state"].key_list)
+    _filter(mask, margins["constituency_key"], constituency, store.dims["constituency"].key_list)
+    order = _page(margins, MARGIN_KEY, limit, after, np.flatnonzero(mask))
+    keys = {name: margins[name][order] for name in ("state_key", "constituency_key", "party_key")}
+    columns = {
+        "year": margins["year"][order],
+        "state_name": store.dims["state"].names[keys["state_key"]],
+        "constituency_name": store.dims["constituency"].names[keys["constituency_key"]],
+        "party": store.dims["party"].names[keys["party_key"]],
+        "margin": margins["margin"][order],
+        **keys,
+        "row_id": margins["row_id"][order],
+    }
+    return _rows(columns, np.arange(len(order)), ints=("margin",))
+
+
+@cached
+def highest_turnout(db: Session):
+    turnout = columnar_store(db).turnout
+    if not len(turnout["year"]):
+        return None
+    # Pre-sorted by year, then turnout descending: the first row of the latest year.
+    first = int(np.searchsorted(turnout["year"], turnout["year"][-1]))
+    columns = {name: turnout[name] for name in ("state_name", "turnout_pct", "year")}
+    return _rows(columns, np.array([first]))[0]
+
+
+@cached
+def women_participation(db: Session):
+    store = columnar_store(db)
+    total = len(store.gender)
+    women = int(np.count_nonzero(store.gender == store.gender_code("F")))
+    return {"percentage": women * 100.0 / total if total and women else None}
+
+
+@cached
+def closest_margins(db: Session, limit: int = 5):
+    store = columnar_store(db)
+    margins = store.margins
+    order = np.flatnonzero(margins["margin"] > 0)[:limit]
+    columns = {
+        "constituency_name": store.dims["constituency"].names[margins["constituency_key"][order]],
+        "state_name": store.dims["state"].names[margins["state_key"][order]],
+        "year": margins["year"][order],
+        "margin": margins["margin"][order],
+    }
+    return _rows(columns, np.arange(len(order)), ints=("margin",))
+
+
+@cached
+def vote_share_trend(db: Session):
+    store = columnar_store(db)
+    categories = len(store.categories)
+    groups = store.year_code * categories + store.category
+    size = len(store.years) * categories
+    present = np.flatnonzero(np.bincount(groups, minlength=size))
+    votes = np.bincount(groups, weights=store.votes, minlength=size)
+    totals = votes.reshape(len(store.years), categories).sum(axis=1)
+    year_code, category = np.divmod(present, categories)
+    total = totals[year_code]
+    share = np.divide(votes[present] * 100.0, total, out=np.zeros(len(present)), where=total != 0)
+    columns = {
+        "year": store.years[year_code],
+        "category": store.categories[category],
+        "vote_pct": share,
+    }
+    return _rows(columns, np.arange(len(present)))
+
+
+@cached
+def education_win_rate(db: Session):
+    store = columnar_store(db)
+    mask = store.education_key >= 0
+    size = len(store.dims["education"].names)
+    candidates = np.bincount(store.education_key[mask], minlength=size)
+    winners = np.bincount(store.education_key[mask], weights=store.is_winner[mask], minlength=size)
+    present = np.flatnonzero(candidates >= EDUCATION_MIN_CANDIDATES)
+    rate = winners[present] * 100.0 / candidates[present]
+    columns = {"education": store.dims["education"].names[present], "win_rate": rate}
+    order = np.lexsort((present, -rate))[:EDUCATION_TOP]
+    return _rows(columns, order)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 
@@ -6,3 +7,49 @@ DATA_DIR = BASE_DIR / "data"
 DATABASE_PATH = DATA_DIR / "elections.db"
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
+# Serving mode opens the database immutable: no file locks or change checks, so
+# readers never contend, but a reload is only seen after restarting the API.
+SERVING_MODE = os.environ.get("ELECTIONS_SERVING_MODE", "0") == "1"
+# Threads running sync handlers; the read-only pool holds one connection per thread.
+API_THREADS = int(os.environ.get("ELECTIONS_API_THREADS", "40"))
+# Per-connection SQLite tuning for the read-only pool.
+SQLITE_MMAP_BYTES = int(os.environ.get("ELECTIONS_SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+SQLITE_CACHE_KIB = int(os.environ.get("ELECTIONS_SQLITE_CACHE_KIB", "16384"))
+SQLITE_CACHED_STATEMENTS = 256
+
+# Response cache: entries kept (0 disables it) and how often the load generation is re-read.
+CACHE_MAX_ENTRIES = int(os.environ.get("ELECTIONS_CACHE_MAX_ENTRIES", "512"))
+CACHE_CHECK_SECONDS = float(os.environ.get("ELECTIONS_CACHE_CHECK_SECONDS", "1.0"))
+
+# Cache-Control max-age sent with ETagged GET responses; clients revalidate after it.
+HTTP_MAX_AGE = int(os.environ.get("ELECTIONS_HTTP_MAX_AGE", "3600"))
+
+# Threads (and read-only connections) used to run the /dashboard panels concurrently.
+DASHBOARD_WORKERS = int(os.environ.get("ELECTIONS_DASHBOARD_WORKERS", "8"))
+
+# Encode list endpoints straight from query rows with orjson instead of per-row models.
+FAST_JSON = os.environ.get("ELECTIONS_FAST_JSON", "0") == "1"
+
+# Largest (and default) page for the keyset-paginated list endpoints.
+MAX_PAGE_SIZE = int(os.environ.get("ELECTIONS_MAX_PAGE_SIZE", "1000"))
+
+# Rows fetched from the server-side cursor per chunk of a streamed export.
+EXPORT_BATCH_ROWS = int(os.environ.get("ELECTIONS_EXPORT_BATCH_ROWS", "5000"))
+
+# Exports streaming at once, each on its own connection outside the request pool;
+# further exports get 503 until one finishes.
+EXPORT_MAX_CONCURRENT = int(os.environ.get("ELECTIONS_EXPORT_MAX_CONCURRENT", "4"))
+
+# Statements slower than this are written, with their query plan, to a rotating
+# JSON-lines log (0 disables it). Summarise with scripts/slow_query_report.py.
+SLOW_QUERY_MS = float(os.environ.get("ELECTIONS_SLOW_QUERY_MS", "250"))
+SLOW_QUERY_LOG = Path(os.environ.get("ELECTIONS_SLOW_QUERY_LOG", str(DATA_DIR / "slow_queries.jsonl")))
+SLOW_QUERY_LOG_BYTES = int(os.environ.get("ELECTIONS_SLOW_QUERY_LOG_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get("ELECTIONS_SLOW_QUERY_LOG_BACKUPS", "5"))
+
+# Engine behind the aggregate and analytics queries: "sql" (SQLite), "numpy"
+# (columnar.py, the fact columns held as in-memory arrays) or "duckdb"
+# (duckdb_engine.py, the full-table aggregations over the loader's Parquet copy).
+QUERY_ENGINE = os.environ.get("ELECTIONS_QUERY_ENGINE", "sql")
+# Year-partitioned Parquet copy of candidates written by load_data.py.
+PARQUET_DIR = Path(os.environ.get("ELECTIONS_PARQUET_DIR", str(DATABASE_PATH.with_suffix(".parquet"))))
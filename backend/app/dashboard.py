@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from .config import DASHBOARD_WORKERS
+from .database import ReadOnlySession
+from .engines import queries
+from .filters import IntFilter, StrFilter, values
+from .margins import DEFAULT_BINS, histogram, margin_index, sorted_margins
+
+_executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+
+
+def _run(query: Callable, **kwargs) -> Any:
+    with ReadOnlySession() as db:
+        return query(db, **kwargs)
+
+
+def _margin_histogram(db, year=None, state=None, constituency=None) -> List[Dict]:
+    years, states = values(year) or [None], values(state) or [None]
+    if constituency or len(years) > 1 or len(states) > 1:
+        # One winner per election, or a union of slices; not worth indexing either.
+        margins = sorted_margins(queries.margin_distribution(db, year, state, constituency))
+    else:
+        margins = margin_index(db).lookup(years[0], states[0])
+    return histogram(margins, DEFAULT_BINS)
+
+
+def build_dashboard(
+    year: IntFilter = None,
+    state: StrFilter = None,
+    parties: StrFilter = None,
+    gender: StrFilter = None,
+    constituency: StrFilter = None,
+    limit: int = 5,
+) -> Dict[str, Any]:
+    """Run every dashboard panel query concurrently, one read-only session each.
+
+    Panels take the same subset of the filters as their standalone endpoints;
+    top vote share needs exactly one year.
+    """
+    panels = {
+        "seat_share": (
+            queries.party_seat_share,
+            dict(year=year, state=state, parties=parties, gender=gender),
+        ),
+        "state_turnout": (queries.state_turnout, dict(year=year, state=state)),
+        "gender_representation": (queries.gender_representation, dict(year=year)),
+        "margin_histogram": (
+            _margin_histogram,
+            dict(year=year, state=state, constituency=constituency),
+        ),
+        "highest_turnout": (queries.highest_turnout, {}),
+        "seat_change": (queries.biggest_seat_change, {}),
+        "women": (queries.women_participation, {}),
+        "close_margins": (queries.closest_margins, {}),
+        "vote_trend": (queries.vote_share_trend, {}),
+        "education": (queries.education_win_rate, {}),
+    }
+    years = values(year)
+    if years and len(years) == 1:
+        panels["top_vote_share"] = (queries.top_vote_share, dict(year=years[0], limit=limit))
+    futures = {
+        name: _executor.submit(_run, query, **kwargs) for name, (query, kwargs) in panels.items()
+    }
+    result = {name: future.result() for name, future in futures.items()}
+    result.setdefault("top_vote_share", [])
+    return result
@@ -1,23 +1,195 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from .config import DATABASE_URL
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    future=True,
+from .config import (
+    API_THREADS,
+    DASHBOARD_WORKERS,
+    DATABASE_PATH,
+    EXPORT_MAX_CONCURRENT,
+    SERVING_MODE,
+    SLOW_QUERY_LOG,
+    SLOW_QUERY_LOG_BACKUPS,
+    SLOW_QUERY_LOG_BYTES,
+    SLOW_QUERY_MS,
+    SQLITE_CACHE_KIB,
+    SQLITE_CACHED_STATEMENTS,
+    SQLITE_MMAP_BYTES,
 )
+from .metrics import current_query
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
+
+def _tune_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_BYTES}")
+    cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KIB}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
+
+def create_readonly_engine(path: Path, immutable: bool = False, pool_size: int = 5) -> Engine:
+    """Engine whose pooled connections are read-only (``mode=ro``) and tuned on connect.
+
+    ``immutable`` also skips SQLite's file locking and change detection; only use it
+    while nothing writes to ``path``.
+    """
+    flags = "mode=ro&immutable=1" if immutable else "mode=ro"
+    readonly = create_engine(
+        f"sqlite:///file:{path}?{flags}&uri=true",
+        connect_args={"check_same_thread": False, "cached_statements": SQLITE_CACHED_STATEMENTS},
+        pool_size=pool_size,
+        max_overflow=0,
+        future=True,
+    )
+    event.listen(readonly, "connect", _tune_connection)
+    return readonly
+
+
+# Sized for every handler thread plus the /dashboard workers so no request waits
+# on the pool.
+readonly_engine = create_readonly_engine(
+    DATABASE_PATH, immutable=SERVING_MODE, pool_size=API_THREADS + DASHBOARD_WORKERS
+)
+# Streamed exports hold a connection for the whole download, so they get their
+# own pool and never take one a request is waiting for.
+export_engine = create_readonly_engine(
+    DATABASE_PATH, immutable=SERVING_MODE, pool_size=EXPORT_MAX_CONCURRENT
+)
+
+
+def _query_plan(path: Path, statement: str, parameters: Any) -> List[Dict[str, Any]]:
+    """EXPLAIN QUERY PLAN for ``statement`` on a fresh read-only connection, outside the pool."""
+    side = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = side.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    finally:
+        side.close()
+    return [{"id": node, "parent": parent, "detail": detail} for node, parent, _, detail in rows]
+
+
+def log_slow_queries(
+    engine: Engine,
+    path: Path,
+    log_path: Path,
+    threshold_ms: float,
+    max_bytes: int = SLOW_QUERY_LOG_BYTES,
+    backups: int = SLOW_QUERY_LOG_BACKUPS,
+) -> logging.Logger:
+    """Write every ``engine`` statement slower than ``threshold_ms`` to ``log_path``.
+
+    Each JSON line carries the SQL as executed, its parameters, the duration, the
+    queries.py function that issued it and its query plan. The plan is taken on a
+    single background thread with its own connection, so the slow request neither
+    waits for it nor holds a second pooled connection.
+    """
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    logger = logging.getLogger(f"{__name__}.slow_queries")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups, delay=True)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-plan")
+
+    def write(record: Dict[str, Any], executemany: bool) -> None:
+        statement = record["sql"].lstrip().upper()
+        if not executemany and statement.startswith(("SELECT", "WITH")):
+            try:
+                record["plan"] = _query_plan(path, record["sql"], record["parameters"])
+            except sqlite3.Error as exc:
+                record["plan_error"] = str(exc)
+        logger.info(json.dumps(record, default=str))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._slow_query_started) * 1000
+        if elapsed_ms < threshold_ms:
+            return
+        record = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "query": current_query.get(),
+            "duration_ms": round(elapsed_ms, 3),
+            "sql": statement,
+            "parameters": parameters,
+        }
+        explainer.submit(write, record, executemany)
+
+    return logger
+
+
+ReadOnlySession = sessionmaker(autocommit=False, autoflush=False, bind=readonly_engine, future=True)
+ExportSession = sessionmaker(autocommit=False, autoflush=False, bind=export_engine, future=True)
+
+if SLOW_QUERY_MS > 0:
+    log_slow_queries(readonly_engine, DATABASE_PATH, SLOW_QUERY_LOG, SLOW_QUERY_MS)
+
+
+def _prepare(connection: sqlite3.Connection, statements: List[Tuple[str, Any]]) -> None:
+    """Compile ``statements`` into ``connection``'s statement cache without running them.
+
+    The sqlite3 module caches a statement before its first step, and a progress
+    handler interrupts that step at once.
+    """
+    connection.set_progress_handler(lambda: 1, 1)
+    try:
+        for statement, parameters in statements:
+            try:
+                connection.execute(statement, parameters)
+            except sqlite3.OperationalError:
+                pass  # interrupted
+    finally:
+        connection.set_progress_handler(None, 1)
+
+
+def open_pool(warm: Optional[Callable[[Session], Any]] = None) -> int:
+    """Open every pooled read-only connection and load its schema up front.
+
+    ``warm`` runs once, on the first connection. The statements it issues are then
+    compiled into every other connection's statement cache without being run, so
+    warming costs one run of them plus a prepare per connection.
+    """
+    engine = ReadOnlySession.kw["bind"]
+    sessions = [ReadOnlySession() for _ in range(engine.pool.size())]
+    statements: List[Tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    try:
+        for db in sessions:
+            db.execute(text("SELECT COUNT(*) FROM sqlite_master")).scalar()
+        if warm is not None and sessions:
+            event.listen(engine, "before_cursor_execute", record)
+            try:
+                warm(sessions[0])
+            finally:
+                event.remove(engine, "before_cursor_execute", record)
+            for db in sessions[1:]:
+                _prepare(db.connection().connection.driver_connection, statements)
+    finally:
+        for db in sessions:
+            db.close()
+    return len(sessions)
 
 
 def get_db():
-    db = SessionLocal()
+    db = ReadOnlySession()
     try:
         yield db
     finally:
         db.close()
-
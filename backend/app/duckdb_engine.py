@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import queries
+from .cache import cached, query_cache
+from .config import PARQUET_DIR
+from .queries import (  # noqa: F401 - served by SQL under either engine
+    MARGIN_KEY,
+    SEAT_SHARE_KEY,
+    SEARCH_MIN_CHARS,
+    TURNOUT_KEY,
+    biggest_seat_change,
+    candidates_by_rowid,
+    closest_margins,
+    gender_representation,
+    get_filters,
+    highest_turnout,
+    margin_distribution,
+    party_seat_share,
+    search_candidates,
+    state_turnout,
+    top_gainers,
+    top_losers,
+    top_vote_share,
+)
+
+try:  # The DuckDB engine is optional; without it every query runs on SQLite.
+    import duckdb
+except ImportError:  # pragma: no cover - depends on the environment
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+# Scripts point this at the copy beside another database.
+parquet_dir: Path = PARQUET_DIR
+
+_lock = threading.Lock()
+_database: Optional[Any] = None
+_database_dir: Optional[Path] = None
+_local = threading.local()
+_warned: set = set()
+
+
+def _cursor():
+    """This thread's cursor on the shared in-memory DuckDB database over ``parquet_dir``."""
+    global _database, _database_dir
+    with _lock:
+        if _database is None or _database_dir != parquet_dir:
+            # Local files only: never fetch extensions (httpfs and the like).
+            database = duckdb.connect(
+                ":memory:",
+                config={"autoinstall_known_extensions": False, "autoload_known_extensions": False},
+            )
+            files = str(parquet_dir / "candidates" / "*" / "*.parquet").replace("'", "''")
+            database.execute(
+                f"CREATE VIEW candidates AS "
+                f"SELECT * FROM read_parquet('{files}', hive_partitioning = true)"
+            )
+            _database, _database_dir = database, parquet_dir
+        database = _database
+    if getattr(_local, "database", None) is not database:
+        _local.database, _local.cursor = database, database.cursor()
+    return _local.cursor
+
+
+def _unavailable() -> Optional[str]:
+    """Why DuckDB cannot answer right now, or None when the Parquet copy is current."""
+    if duckdb is None:
+        return "duckdb is not installed"
+    try:
+        stamp = (parquet_dir / "generation").read_text().strip()
+    except OSError:
+        return f"no Parquet copy at {parquet_dir}"
+    if stamp != query_cache.current_generation():
+        return f"the Parquet copy at {parquet_dir} is from another load"
+    return None
+
+
+def available() -> bool:
+    return _unavailable() is None
+
+
+def _fetch(sql: str) -> List[Dict[str, Any]]:
+    cursor = _cursor().execute(sql)
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def _falls_back(func: Callable) -> Callable:
+    """Run ``func`` on DuckDB when it can, else the queries.py function of the same name."""
+    fallback = inspect.unwrap(getattr(queries, func.__name__))
+
+    @functools.wraps(func)
+    def wrapper(db: Session, *args, **kwargs):
+        reason = _unavailable()
+        if reason is None:
+            try:
+                return func(db, *args, **kwargs)
+            except duckdb.Error as exc:
+                reason = f"DuckDB failed: {exc}"
+        if reason not in _warned:
+            _warned.add(reason)
+            logger.warning("Answering from SQLite: %s", reason)
+        return fallback(db, *args, **kwargs)
+
+    return wrapper
+
+
+@cached
+@_falls_back
+def women_participation(db: Session):
+    return _fetch(
+        """
+        SELECT NULLIF(COUNT(*) FILTER (WHERE gender = 'F'), 0) * 100.0 / COUNT(*) AS percentage
+        FROM candidates
+        """
+    )[0]
+
+
+@cached
+@_falls_back
+def vote_share_trend(db: Session):
+    # ILIKE: SQLite's LIKE, which queries.py relies on, ignores ASCII case. Summing
+    # per party_type first matches each distinct type once instead of every row.
+    return _fetch(
+        """
+        WITH by_type AS (
+            SELECT year, party_type, SUM(votes) AS votes
+            FROM candidates
+            GROUP BY year, party_type
+        ),
+        classified AS (
+            SELECT year,
+                   CASE
+                       WHEN party_type ILIKE '%National%' THEN 'National'
+                       WHEN party_type ILIKE '%State%' THEN 'Regional'
+                       ELSE 'Other'
+                   END AS category,
+                   SUM(votes) AS votes
+            FROM by_type
+            GROUP BY year, category
+        )
+        SELECT year,
+               category,
+               COALESCE(votes * 100.0 / NULLIF(SUM(votes) OVER (PARTITION BY year), 0), 0) AS vote_pct
+        FROM classified
+        ORDER BY year, category
+        """
+    )
+
+
+@cached
+@_falls_back
+def education_win_rate(db: Session):
+    return _fetch(
+        """
+        SELECT education, COUNT(*) FILTER (WHERE is_winner = 1) * 100.0 / COUNT(*) AS win_rate
+        FROM candidates
+        WHERE education IS NOT NULL
+        GROUP BY education
+        HAVING COUNT(*) >= 50
+        ORDER BY win_rate DESC
+        LIMIT 10
+        """
+    )
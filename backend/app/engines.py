@@ -0,0 +1,15 @@
+"""The query functions the API serves from, chosen by ``ELECTIONS_QUERY_ENGINE``."""
+from __future__ import annotations
+
+from .config import QUERY_ENGINE
+
+if QUERY_ENGINE == "numpy":
+    from . import columnar as queries
+elif QUERY_ENGINE == "duckdb":
+    from . import duckdb_engine as queries
+elif QUERY_ENGINE == "sql":
+    from . import queries
+else:
+    raise ValueError(f"ELECTIONS_QUERY_ENGINE must be 'sql', 'numpy' or 'duckdb', not {QUERY_ENGINE!r}")
+
+__all__ = ["queries"]
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import csv
+import io
+import threading
+import weakref
+import zlib
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import metrics
+from .config import EXPORT_BATCH_ROWS, EXPORT_MAX_CONCURRENT
+from .database import ExportSession
+from .filters import Filters, IntFilter, StrFilter
+
+try:  # Arrow output is optional.
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+
+_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Key columns of ``candidates`` exported as the dimension value they encode.
+_DIMENSIONS = {
+    "state_key": ("dim_state", "state_name"),
+    "party_key": ("dim_party", "party"),
+    "constituency_key": ("dim_constituency", "constituency_name"),
+    "education_key": ("dim_education", "education"),
+}
+# Storage classes SQLite reports through typeof(), probed per column over the
+# exported rows: a declared type does not bound what a column holds (one a chunked
+# load declared FLOAT can hold text).
+_STORAGE_CLASSES = ("integer", "real", "text", "blob")
+# Arrow type and Python converter for declared SQLite types, matched the way
+# SQLite derives column affinity (by substring); used for all-NULL columns.
+_ARROW_AFFINITIES = [
+    (("BOOL",), ("bool_", bool)),
+    (("INT",), ("int64", int)),
+    (("CHAR", "CLOB", "TEXT"), ("string", str)),
+    (("REAL", "FLOA", "DOUB"), ("float64", float)),
+]
+
+
+def _arrow_type(declared: str, classes: Set[str]) -> Tuple[str, type]:
+    """Arrow type and Python converter for a column holding values of ``classes``."""
+    if classes - {"integer", "real"}:
+        return ("string", str)
+    if classes == {"integer"}:
+        # Booleans are stored as 0/1; only the declared type tells them apart.
+        return ("bool_", bool) if "BOOL" in declared else ("int64", int)
+    if classes:
+        return ("float64", float)
+    for fragments, arrow_type in _ARROW_AFFINITIES:
+        if any(fragment in declared for fragment in fragments):
+            return arrow_type
+    return ("string", str)
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (``gzip;q=0`` refuses)."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+    return weights.get("gzip", weights.get("x-gzip", weights.get("*", 0.0))) > 0
+
+
+def _columns(db: Session) -> List[Tuple[str, str, str]]:
+    """(select expression, output name, declared type) for every candidates column."""
+    columns = []
+    for _, name, declared, *_ in db.execute(text("PRAGMA table_info(candidates)")):
+        if name in _DIMENSIONS:
+            table, value = _DIMENSIONS[name]
+            expr = f"(SELECT d.{value} FROM {table} AS d WHERE d.{name} = c.{name})"
+            columns.append((expr, value, "TEXT"))
+        else:
+            columns.append((f"c.{name}", name, declared.upper()))
+    return columns
+
+
+def _statement(
+    select: str,
+    year: IntFilter,
+    state: StrFilter,
+    parties: StrFilter,
+    gender: StrFilter,
+):
+    sql = f"SELECT {select} FROM candidates AS c"
+    filters = (
+        Filters()
+        .equal("c.year", "year", year)
+        .lookup("c.state_key", "state_name", state, "dim_state", "state_key", "state_name")
+        .lookup("c.party_key", "parties", parties, "dim_party", "party_key", "party")
+        .equal("c.gender", "gender", gender)
+    )
+    return filters.statement(sql + filters.where()), filters.params
+
+
+def _arrow_types(
+    db: Session, columns: Sequence[Tuple[str, str, str]], filters: Sequence
+) -> List[Tuple[str, type]]:
+    """Arrow type and converter of each column, from the storage classes of the exported rows.
+
+    Dimension columns are always text. The probe reads the matching rows once
+    before streaming them, as an Arrow stream fixes its schema up front.
+    """
+    probed = [(expr, name) for expr, name, _ in columns if not expr.startswith("(")]
+    flags = [
+        f"MAX(typeof({expr}) = '{storage}')" for expr, _ in probed for storage in _STORAGE_CLASSES
+    ]
+    found: Dict[str, Set[str]] = {}
+    if probed:
+        statement, params = _statement(", ".join(flags), *filters)
+        row = db.execute(statement, params).one()
+        width = len(_STORAGE_CLASSES)
+        for index, (_, name) in enumerate(probed):
+            seen = row[index * width : (index + 1) * width]
+            found[name] = {storage for storage, flag in zip(_STORAGE_CLASSES, seen) if flag}
+    return [
+        _arrow_type(declared, found[name]) if name in found else ("string", str)
+        for _, name, declared in columns
+    ]
+
+
+def _csv(names: List[str], batches: Iterator[Sequence]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _ndjson(names: List[str], batches: Iterator[Sequence]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(orjson.dumps(dict(zip(names, row))) + b"\n" for row in batch)
+
+
+class _Chunks:
+    """Write-only sink that hands back whatever Arrow wrote since the last drain."""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def _arrow(
+    columns: Sequence[Tuple[str, str, str]],
+    types: Sequence[Tuple[str, type]],
+    batches: Iterator[Sequence],
+) -> Iterator[bytes]:
+    schema = pa.schema(
+        [(name, getattr(pa, arrow_type)()) for (_, name, _), (arrow_type, _) in zip(columns, types)]
+    )
+    sink = _Chunks()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema) as writer:
+        for batch in batches:
+            arrays = [
+                pa.array(
+                    [None if row[i] is None else convert(row[i]) for row in batch],
+                    type=schema.field(i).type,
+                )
+                for i, (_, convert) in enumerate(types)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_candidates(
+    fmt: str,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    parties: StrFilter = None,
+    gender: StrFilter = None,
+    gzip: bool = False,
+) -> Optional[Iterator[bytes]]:
+    """Stream matching ``candidates`` rows as ``fmt`` bytes, EXPORT_BATCH_ROWS at a time.
+
+    Returns None when EXPORT_MAX_CONCURRENT exports are already streaming. The
+    slot is held until the stream is finished or dropped, even unstarted.
+    """
+    if not _slots.acquire(blocking=False):
+        return None
+    chunks = _stream(fmt, year, state, parties, gender, gzip)
+    return _holding_slot(chunks, weakref.finalize(chunks, _slots.release))
+
+
+def _holding_slot(chunks: Iterator[bytes], release: weakref.finalize) -> Iterator[bytes]:
+    # Released as soon as the stream ends or is closed; the finalizer covers a
+    # stream that is dropped before it starts, and runs at most once.
+    try:
+        yield from chunks
+    finally:
+        release()
+
+
+def _stream(
+    fmt: str,
+    year: IntFilter,
+    state: StrFilter,
+    parties: StrFilter,
+    gender: StrFilter,
+    gzip: bool,
+) -> Iterator[bytes]:
+    # The generator owns its export-pool session, so it outlives the request's
+    # dependencies, and the rows come off a server-side cursor one batch at a time.
+    with ExportSession() as db:
+        # Labels the statements' timings; reset before the first yield, as each
+        # batch may be pulled from a different context.
+        token = metrics.current_query.set("export_candidates")
+        try:
+            columns = _columns(db)
+            names = [name for _, name, _ in columns]
+            filters = (year, state, parties, gender)
+            types = _arrow_types(db, columns, filters) if fmt == "arrow" else []
+            select = ", ".join(f"{expr} AS {name}" for expr, name, _ in columns)
+            statement, params = _statement(select, *filters)
+            result = (
+                db.connection()
+                .execution_options(stream_results=True)
+                .execute(statement, params)
+            )
+        finally:
+            metrics.current_query.reset(token)
+        batches = result.partitions(EXPORT_BATCH_ROWS)
+        if fmt == "arrow":
+            chunks = _arrow(columns, types, batches)
+        elif fmt == "ndjson":
+            chunks = _ndjson(names, batches)
+        else:
+            chunks = _csv(names, batches)
+        yield from _gzip(chunks) if gzip else chunks
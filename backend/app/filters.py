@@ -0,0 +1,108 @@
+"""WHERE-clause builder shared by the query modules.
+
+Every filter takes one value or several. One value binds as ``column = :name``;
+several bind through an expanding ``IN :name`` parameter whose list is padded, by
+repeating its last value, up to the next power of BUCKET_BASE. A query therefore
+renders one of a few statement texts whatever the selection, and both
+SQLAlchemy's compiled cache and SQLite's per-connection statement cache keep
+hitting.
+"""
+from __future__ import annotations
+
+import functools
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.sql.elements import TextClause
+
+IntFilter = Union[int, Sequence[int], None]
+StrFilter = Union[str, Sequence[str], None]
+
+# Multi-value lists are padded to 4, 16, 64, ... values.
+BUCKET_BASE = 4
+STATEMENT_CACHE_SIZE = 512
+
+
+def values(value: Any) -> Optional[List[Any]]:
+    """``value`` as a sorted list of its distinct values, or None when it filters nothing."""
+    items = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+    items = sorted({item for item in items if item})
+    return items or None
+
+
+def bucket(size: int) -> int:
+    """The padded length of a list of ``size`` values."""
+    padded = 1
+    while padded < size:
+        padded *= BUCKET_BASE
+    return padded
+
+
+def padded(items: Sequence[Any]) -> List[Any]:
+    return list(items) + [items[-1]] * (bucket(len(items)) - len(items))
+
+
+@functools.lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def statement(sql: str, expanding: Tuple[str, ...] = ()) -> TextClause:
+    """The ``text()`` construct for ``sql``, built once per statement shape."""
+    clause = text(sql)
+    if expanding:
+        clause = clause.bindparams(*(bindparam(name, expanding=True) for name in expanding))
+    return clause
+
+
+class Filters:
+    """Predicates and bound parameters for one statement.
+
+    ``fixed`` lists the columns pinned to a single value, which keyset orders
+    leave out (see ``pagination.order_by``).
+    """
+
+    def __init__(self, *predicates: str, **params: Any):
+        self.predicates: List[str] = list(predicates)
+        self.params: Dict[str, Any] = dict(params)
+        self.expanding: List[str] = []
+        self.fixed: List[str] = []
+
+    def add(self, predicate: str, **params: Any) -> "Filters":
+        self.predicates.append(predicate)
+        self.params.update(params)
+        return self
+
+    def _bind(self, name: str, items: List[Any]) -> str:
+        if len(items) == 1:
+            self.params[name] = items[0]
+            return f"= :{name}"
+        self.params[name] = padded(items)
+        self.expanding.append(name)
+        return f"IN :{name}"
+
+    def equal(self, column: str, name: str, value: Any) -> "Filters":
+        """``column`` equal to ``value``, or to any of several values."""
+        items = values(value)
+        if items:
+            self.predicates.append(f"{column} {self._bind(name, items)}")
+            if len(items) == 1:
+                self.fixed.append(column)
+        return self
+
+    def lookup(self, column: str, name: str, value: Any, table: str, key: str, label: str) -> "Filters":
+        """``column`` holding the ``key`` of the ``table`` rows whose ``label`` matches ``value``."""
+        items = values(value)
+        if items:
+            match = self._bind(name, items)
+            if len(items) == 1:
+                self.predicates.append(f"{column} = (SELECT {key} FROM {table} WHERE {label} {match})")
+                self.fixed.append(column)
+            else:
+                self.predicates.append(f"{column} IN (SELECT {key} FROM {table} WHERE {label} {match})")
+        return self
+
+    def sql(self) -> str:
+        return " AND ".join(self.predicates)
+
+    def where(self) -> str:
+        return f" WHERE {self.sql()}" if self.predicates else ""
+
+    def statement(self, sql: str) -> TextClause:
+        return statement(sql, tuple(self.expanding))
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .cache import query_cache
+
+NGRAM = 3
+# Names shortlisted by n-gram overlap before edit distance is computed.
+SHORTLIST = 200
+MIN_OVERLAP = 0.2
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(name: str) -> str:
+    return " ".join(_NON_ALNUM.sub(" ", name.lower()).split())
+
+
+def _grams(name: str) -> List[str]:
+    padded = f" {name} "
+    return sorted({padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)})
+
+
+def edit_distance(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            )
+        previous = current
+    return previous[-1]
+
+
+def _csr(keys: array, values: array, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Group ``values`` by ``keys`` into (offsets, values) arrays."""
+    keys_np = np.frombuffer(keys, dtype=np.int32)
+    order = np.argsort(keys_np, kind="stable")
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys_np, minlength=size), out=offsets[1:])
+    return offsets, np.frombuffer(values, dtype=np.int32)[order]
+
+
+class NgramIndex:
+    """Trigram inverted index over the distinct names in ``candidate_lookup``.
+
+    Posting lists and the name -> row mapping are CSR arrays (one offsets array
+    plus one flat int32 array) so memory grows with the number of postings,
+    not with Python objects per posting. Each name's rows are kept in the order
+    given, newest election first.
+    """
+
+    def __init__(self, names: List[str], rows: Dict[str, array], generation: Optional[str] = None):
+        self.generation = generation
+        self.names = [normalize(name) for name in names]
+        self.vocabulary: Dict[str, int] = {}
+        gram_keys, gram_names = array("i"), array("i")
+        row_keys, row_ids = array("i"), array("i")
+        self.gram_counts = np.zeros(len(names), dtype=np.int16)
+        for name_id, (raw, name) in enumerate(zip(names, self.names)):
+            grams = _grams(name)
+            self.gram_counts[name_id] = len(grams)
+            for gram in grams:
+                gram_keys.append(self.vocabulary.setdefault(gram, len(self.vocabulary)))
+                gram_names.append(name_id)
+            for rowid in rows[raw]:
+                row_keys.append(name_id)
+                row_ids.append(rowid)
+        self.gram_offsets, self.postings = _csr(gram_keys, gram_names, len(self.vocabulary))
+        self.row_offsets, self.rowids = _csr(row_keys, row_ids, len(names))
+
+    @classmethod
+    def from_database(cls, db: Session, generation: Optional[str] = None) -> "NgramIndex":
+        rows: Dict[str, array] = {}
+        result = db.execute(
+            text("SELECT rowid, candidate_name FROM candidate_lookup ORDER BY year DESC, rowid")
+        )
+        for rowid, name in result:
+            if name:
+                rows.setdefault(name, array("i")).append(rowid)
+        return cls(list(rows), rows, generation)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.gram_offsets, self.postings, self.row_offsets, self.rowids, self.gram_counts]
+        return sum(arr.nbytes for arr in arrays)
+
+    def search(self, query: str, limit: int = 20, budget_ms: float = 50.0) -> List[Tuple[int, float]]:
+        """Return up to ``limit`` (rowid, score) pairs, best first.
+
+        Names are shortlisted by Dice overlap of trigrams, then re-scored with
+        edit distance until ``budget_ms`` runs out; names not re-scored in time
+        are dropped rather than returned with a partial score.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        name = normalize(query)
+        grams = _grams(name)
+        gram_ids = [self.vocabulary[g] for g in grams if g in self.vocabulary]
+        if not name or not gram_ids:
+            return []
+        hits = np.concatenate(
+            [self.postings[self.gram_offsets[g]:self.gram_offsets[g + 1]] for g in gram_ids]
+        )
+        name_ids, overlap = np.unique(hits, return_counts=True)
+        dice = 2 * overlap / (len(grams) + self.gram_counts[name_ids])
+        keep = dice >= MIN_OVERLAP
+        name_ids, dice = name_ids[keep], dice[keep]
+        if len(name_ids) > SHORTLIST:
+            top = np.argpartition(-dice, SHORTLIST)[:SHORTLIST]
+            name_ids, dice = name_ids[top], dice[top]
+        order = np.argsort(-dice, kind="stable")
+
+        scored = []
+        for name_id, overlap_score in zip(name_ids[order], dice[order]):
+            if scored and time.perf_counter() > deadline:
+                break
+            candidate = self.names[name_id]
+            similarity = 1 - edit_distance(name, candidate) / max(len(name), len(candidate))
+            scored.append((0.5 * float(overlap_score) + 0.5 * similarity, int(name_id)))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        results: List[Tuple[int, float]] = []
+        for score, name_id in scored:
+            start, end = self.row_offsets[name_id], self.row_offsets[name_id + 1]
+            results.extend((int(rowid), round(score, 4)) for rowid in self.rowids[start:end])
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+
+_lock = threading.Lock()
+_index: Optional[NgramIndex] = None
+
+
+def fuzzy_index(db: Session) -> NgramIndex:
+    """The index for the current load generation, rebuilt after a reload.
+
+    It maps names to ``candidate_lookup`` rowids, which a reload reassigns.
+    """
+    global _index
+    generation = query_cache.current_generation()
+    with _lock:
+        if _index is None or _index.generation != generation:
+            _index = NgramIndex.from_database(db, generation)
+        return _index
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from .cache import query_cache
+from .config import HTTP_MAX_AGE
+
+# Responses that are not a pure function of the loaded data and the query string.
+# Exports also vary with Accept-Encoding, which the tag does not cover.
+UNVERSIONED_PATHS = {
+    "/search/fuzzy",
+    "/cache/stats",
+    "/metrics",
+    "/export/candidates",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+}
+
+
+def make_etag(version: str, generation: str, request: Request) -> str:
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{version}|{generation}|{request.url.path}?{params}".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+async def conditional_get(request: Request, call_next):
+    """Tag GET responses with the dataset version and answer revalidations with 304.
+
+    The generation is the cached load stamp, so a 304 is produced without running
+    any query.
+    """
+    if request.method != "GET" or request.url.path in UNVERSIONED_PATHS:
+        return await call_next(request)
+    generation = await run_in_threadpool(query_cache.current_generation)
+    if generation is None:
+        return await call_next(request)
+    etag = make_etag(request.app.version, generation, request)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={HTTP_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
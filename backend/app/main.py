@@ -1,93 +1,304 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable, List, Literal, Mapping, Optional, Tuple, Type
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from anyio import to_thread
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.exc import OperationalError
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from .database import get_db
-from . import queries
+from .cache import query_cache
+from .config import API_THREADS, FAST_JSON, MAX_PAGE_SIZE, QUERY_ENGINE, SERVING_MODE
+from .dashboard import build_dashboard
+from .database import ReadOnlySession, export_engine, get_db, open_pool, readonly_engine
+from .engines import queries
+from . import columnar, export, metrics
+from .fuzzy import fuzzy_index
+from .http_cache import conditional_get
+from .margins import DEFAULT_BINS, DEFAULT_PERCENTILES, histogram, margin_index, quantiles
+from .pagination import SortKey, decode_cursor, split_page
+from .serialization import encode_rows
 from . import schemas
 
-app = FastAPI(title="Indian General Elections API", version="1.0.0")
-
+logger = logging.getLogger(__name__)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# The statements the default dashboard and the first page of each list endpoint
+# issue, run once and compiled on every pooled connection at startup in serving mode.
+HOT_QUERIES: List[Tuple[str, Dict[str, Any]]] = [
+    ("party_seat_share", {}),
+    ("party_seat_share", {"limit": MAX_PAGE_SIZE}),
+    ("state_turnout", {}),
+    ("state_turnout", {"limit": MAX_PAGE_SIZE}),
+    ("margin_distribution", {"limit": MAX_PAGE_SIZE}),
+    ("gender_representation", {}),
+    ("highest_turnout", {}),
+    ("biggest_seat_change", {}),
+    ("women_participation", {}),
+    ("closest_margins", {}),
+    ("vote_share_trend", {}),
+    ("education_win_rate", {}),
+    ("top_gainers", {}),
+    ("top_losers", {}),
+]
+
+
+def _warm_statements(db: Session) -> None:
+    # Uncached, so each statement is issued even when its result is cached.
+    for name, kwargs in HOT_QUERIES:
+        getattr(queries, name).__wrapped__(db, **kwargs)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = API_THREADS
+    loaded = False
+    try:
+        with ReadOnlySession() as db:
+            fuzzy_index(db)
+        loaded = True
+    except OperationalError as exc:
+        logger.warning("Fuzzy index not built, could not read candidate_lookup: %s", exc)
+    try:
+        with ReadOnlySession() as db:
+            margin_index(db)
+    except OperationalError as exc:
+        logger.warning("Margin index not built, could not read victory_margins: %s", exc)
+    if QUERY_ENGINE == "numpy":
+        with ReadOnlySession() as db:
+            store = columnar.columnar_store(db)
+        logger.info("Columnar query engine loaded: %.1f MB of arrays", store.nbytes / 1e6)
+    if SERVING_MODE and loaded:
+        # Open the whole pool with the hot statements compiled on every connection,
+        # and run the default dashboard once so its panels start out cached.
+        connections = open_pool(_warm_statements)
+        with ReadOnlySession() as db:
+            queries.get_filters(db)
+        build_dashboard()
+        logger.info("Serving mode: %d read-only connections warmed", connections)
+    yield
+
+
+app = FastAPI(title="Indian General Elections API", version="1.0.0", lifespan=lifespan)
+
+app.middleware("http")(conditional_get)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", NEXT_CURSOR_HEADER],
 )
+# Added last so it is outermost and times the whole stack, 304s included.
+app.middleware("http")(metrics.record_request)
+metrics.instrument_engine(readonly_engine)
+metrics.instrument_engine(export_engine)
+
+
+def _rows(model: Type[BaseModel], rows: Iterable[Mapping], headers: Optional[Dict[str, str]] = None):
+    """Build ``List[model]``, or pre-encoded JSON of the same shape when FAST_JSON is on."""
+    if FAST_JSON:
+        return Response(encode_rows(rows, model), media_type="application/json", headers=headers)
+    return [model(**row) for row in rows]
+
+
+def _after(cursor: Optional[str], key: SortKey) -> Optional[Tuple[Any, ...]]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, key)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _page(model: Type[BaseModel], rows, limit: int, key: SortKey, response: Response):
+    """One page of ``rows``; the cursor for the next page, if any, goes in X-Next-Cursor."""
+    rows, next_cursor = split_page(rows, limit, key)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    response.headers.update(headers)
+    return _rows(model, rows, headers)
 
 
 @app.get("/filters", response_model=schemas.FiltersResponse)
-def get_filters(db: Session = Depends(get_db)):
-    data = queries.get_filters(db)
+def get_filters(
+    state: Optional[str] = None,
+    year: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    data = queries.get_filters(db, state, year)
     return schemas.FiltersResponse(**data)
 
 
 @app.get("/party-seat-share", response_model=List[schemas.PartySeatShare])
 def party_seat_share(
-    year: Optional[int] = None,
-    state: Optional[str] = None,
+    response: Response,
+    year: Optional[List[int]] = Query(default=None),
+    state: Optional[List[str]] = Query(default=None),
     parties: Optional[List[str]] = Query(default=None),
-    gender: Optional[str] = None,
+    gender: Optional[List[str]] = Query(default=None),
+    limit: int = Query(default=MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    result = queries.party_seat_share(db, year, state, parties, gender)
-    return [schemas.PartySeatShare(**row) for row in result]
+    after = _after(cursor, queries.SEAT_SHARE_KEY)
+    result = queries.party_seat_share(db, year, state, parties, gender, limit, after)
+    return _page(schemas.PartySeatShare, result, limit, queries.SEAT_SHARE_KEY, response)
 
 
 @app.get("/state-turnout", response_model=List[schemas.StateTurnout])
 def state_turnout(
-    year: Optional[int] = None,
-    state: Optional[str] = None,
+    response: Response,
+    year: Optional[List[int]] = Query(default=None),
+    state: Optional[List[str]] = Query(default=None),
+    limit: int = Query(default=MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
-    result = queries.state_turnout(db, year, state)
-    return [schemas.StateTurnout(**row) for row in result]
+    after = _after(cursor, queries.TURNOUT_KEY)
+    result = queries.state_turnout(db, year, state, limit, after)
+    return _page(schemas.StateTurnout, result, limit, queries.TURNOUT_KEY, response)
 
 
 @app.get("/gender-representation", response_model=List[schemas.GenderRepresentation])
 def gender_representation(
-    year: Optional[int] = None, db: Session = Depends(get_db)
+    year: Optional[List[int]] = Query(default=None), db: Session = Depends(get_db)
 ):
     result = queries.gender_representation(db, year)
-    return [schemas.GenderRepresentation(**row) for row in result]
+    return _rows(schemas.GenderRepresentation, result)
 
 
 @app.get("/top-vote-share", response_model=List[schemas.VoteShare])
 def top_vote_share(year: int, limit: int = 5, db: Session = Depends(get_db)):
     result = queries.top_vote_share(db, year, limit)
-    return [schemas.VoteShare(**row) for row in result]
+    return _rows(schemas.VoteShare, result)
 
 
 @app.get("/margin-distribution", response_model=List[schemas.MarginRecord])
 def margin_distribution(
+    response: Response,
+    year: Optional[List[int]] = Query(default=None),
+    state: Optional[List[str]] = Query(default=None),
+    constituency: Optional[List[str]] = Query(default=None),
+    limit: int = Query(default=MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    after = _after(cursor, queries.MARGIN_KEY)
+    result = queries.margin_distribution(db, year, state, constituency, limit, after)
+    return _page(schemas.MarginRecord, result, limit, queries.MARGIN_KEY, response)
+
+
+@app.get("/margin-distribution/histogram", response_model=schemas.MarginHistogram)
+def margin_histogram(
     year: Optional[int] = None,
     state: Optional[str] = None,
-    constituency: Optional[str] = None,
+    party: Optional[str] = None,
+    bins: int = Query(default=DEFAULT_BINS, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    result = queries.margin_distribution(db, year, state, constituency)
-    return [schemas.MarginRecord(**row) for row in result]
+    margins = margin_index(db).lookup(year or None, state, party)
+    return schemas.MarginHistogram(count=len(margins), bins=histogram(margins, bins))
 
 
-@app.get("/search", response_model=List[schemas.CandidateLookup])
-def search(
-    query: str,
+@app.get("/margin-distribution/quantiles", response_model=schemas.MarginQuantiles)
+def margin_quantiles(
     year: Optional[int] = None,
     state: Optional[str] = None,
     party: Optional[str] = None,
-    gender: Optional[str] = None,
-    constituency: Optional[str] = None,
+    percentiles: List[float] = Query(default=list(DEFAULT_PERCENTILES)),
+    db: Session = Depends(get_db),
+):
+    if not all(0 <= p <= 100 for p in percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100.")
+    margins = margin_index(db).lookup(year or None, state, party)
+    return schemas.MarginQuantiles(count=len(margins), quantiles=quantiles(margins, percentiles))
+
+
+@app.get("/export/candidates", response_class=StreamingResponse)
+def export_candidates(
+    request: Request,
+    format: Literal["csv", "ndjson", "arrow"] = "csv",
+    year: Optional[List[int]] = Query(default=None),
+    state: Optional[List[str]] = Query(default=None),
+    parties: Optional[List[str]] = Query(default=None),
+    gender: Optional[List[str]] = Query(default=None),
+):
+    if format == "arrow" and export.pa is None:
+        raise HTTPException(status_code=501, detail="Arrow export needs pyarrow installed.")
+    gzip = export.accepts_gzip(request.headers.get("accept-encoding", ""))
+    headers = {
+        "Content-Disposition": f'attachment; filename="candidates.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    chunks = export.export_candidates(format, year, state, parties, gender, gzip)
+    if chunks is None:
+        raise HTTPException(
+            status_code=503, detail="Too many exports in progress.", headers={"Retry-After": "5"}
+        )
+    return StreamingResponse(chunks, media_type=export.MEDIA_TYPES[format], headers=headers)
+
+
+@app.get("/dashboard", response_model=schemas.DashboardResponse)
+def dashboard(
+    year: Optional[List[int]] = Query(default=None),
+    state: Optional[List[str]] = Query(default=None),
+    parties: Optional[List[str]] = Query(default=None),
+    gender: Optional[List[str]] = Query(default=None),
+    constituency: Optional[List[str]] = Query(default=None),
+    limit: int = 5,
+):
+    data = build_dashboard(year, state, parties, gender, constituency, limit)
+    # Single-row panels map to None where their endpoints answer 404.
+    for name in ["highest_turnout", "seat_change", "women"]:
+        if data[name] is not None and not any(v is not None for v in data[name].values()):
+            data[name] = None
+    return schemas.DashboardResponse(**data)
+
+
+@app.get("/search", response_model=List[schemas.CandidateLookup])
+def search(
+    query: str,
+    year: Optional[List[int]] = Query(default=None),
+    state: Optional[List[str]] = Query(default=None),
+    party: Optional[List[str]] = Query(default=None),
+    gender: Optional[List[str]] = Query(default=None),
+    constituency: Optional[List[str]] = Query(default=None),
     limit: int = 20,
     db: Session = Depends(get_db),
 ):
     if not query:
         raise HTTPException(status_code=400, detail="Query parameter cannot be empty.")
     result = queries.search_candidates(db, query, year, state, party, gender, constituency, limit)
-    return [schemas.CandidateLookup(**row) for row in result]
+    return _rows(schemas.CandidateLookup, result)
+
+
+@app.get("/search/fuzzy", response_model=List[schemas.FuzzyCandidate])
+def search_fuzzy(
+    query: str,
+    limit: int = Query(default=20, ge=1, le=200),
+    budget_ms: float = Query(default=50.0, gt=0, le=1000),
+    db: Session = Depends(get_db),
+):
+    if not query.strip():
+        raise HTTPException(status_code=400, detail="Query parameter cannot be empty.")
+    try:
+        index = fuzzy_index(db)
+    except OperationalError as exc:
+        raise HTTPException(status_code=503, detail="Fuzzy search index is not available.") from exc
+    scored = index.search(query, limit, budget_ms)
+    rows = queries.candidates_by_rowid(db, [rowid for rowid, _ in scored])
+    return [
+        schemas.FuzzyCandidate(**rows[rowid], score=score) for rowid, score in scored if rowid in rows
+    ]
 
 
 @app.get("/analytics/highest-turnout", response_model=schemas.TurnoutAnswer)
@@ -106,6 +317,28 @@ def seat_change(db: Session = Depends(get_db)):
     return schemas.SeatChangeAnswer(**row)
 
 
+@app.get("/analytics/top-gainers", response_model=List[schemas.SeatSwing])
+def top_gainers(
+    state: Optional[List[str]] = Query(default=None),
+    year: Optional[List[int]] = Query(default=None),
+    limit: int = Query(default=5, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    data = queries.top_gainers(db, state, year, limit)
+    return _rows(schemas.SeatSwing, data)
+
+
+@app.get("/analytics/top-losers", response_model=List[schemas.SeatSwing])
+def top_losers(
+    state: Optional[List[str]] = Query(default=None),
+    year: Optional[List[int]] = Query(default=None),
+    limit: int = Query(default=5, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    data = queries.top_losers(db, state, year, limit)
+    return _rows(schemas.SeatSwing, data)
+
+
 @app.get("/analytics/women-participation", response_model=schemas.WomenParticipationAnswer)
 def women_participation(db: Session = Depends(get_db)):
     row = queries.women_participation(db)
@@ -117,17 +350,28 @@ def women_participation(db: Session = Depends(get_db)):
 @app.get("/analytics/close-margins", response_model=List[schemas.CloseContestAnswer])
 def close_margins(limit: int = 5, db: Session = Depends(get_db)):
     data = queries.closest_margins(db, limit)
-    return [schemas.CloseContestAnswer(**row) for row in data]
+    return _rows(schemas.CloseContestAnswer, data)
 
 
 @app.get("/analytics/vote-share-trend", response_model=List[schemas.VoteShareTrendAnswer])
 def vote_share_trend(db: Session = Depends(get_db)):
     data = queries.vote_share_trend(db)
-    return [schemas.VoteShareTrendAnswer(**row) for row in data]
+    return _rows(schemas.VoteShareTrendAnswer, data)
 
 
 @app.get("/analytics/education-win-rate", response_model=List[schemas.EducationWinRateAnswer])
 def education_win_rate(db: Session = Depends(get_db)):
     data = queries.education_win_rate(db)
-    return [schemas.EducationWinRateAnswer(**row) for row in data]
+    return _rows(schemas.EducationWinRateAnswer, data)
+
+
+@app.get("/cache/stats", response_model=schemas.CacheStats)
+def cache_stats():
+    return schemas.CacheStats(**query_cache.stats())
+
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(
+        metrics.render(query_cache.stats()), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
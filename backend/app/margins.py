@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .cache import query_cache
+
+FILTERS = ("year", "state_name", "party")
+DEFAULT_BINS = 30
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0)
+# (year, state, party); None matches any value.
+GroupKey = Tuple[Optional[int], Optional[str], Optional[str]]
+
+
+def histogram(margins: np.ndarray, bins: int) -> List[Dict]:
+    """Equal-width bins over sorted ``margins``; the last bin includes the maximum."""
+    if not len(margins):
+        return []
+    low, high = float(margins[0]), float(margins[-1])
+    edges = np.linspace(low, high, bins + 1) if high > low else np.array([low, high])
+    cuts = np.searchsorted(margins, edges, side="left")
+    cuts[-1] = len(margins)
+    return [
+        {"lower": float(edges[i]), "upper": float(edges[i + 1]), "count": int(cuts[i + 1] - cuts[i])}
+        for i in range(len(edges) - 1)
+    ]
+
+
+def quantiles(margins: np.ndarray, percentiles: Sequence[float]) -> List[Dict]:
+    """Linearly interpolated percentiles of sorted ``margins``, as ``numpy.percentile``."""
+    if not len(margins):
+        return []
+    result = []
+    for percentile in percentiles:
+        position = percentile / 100 * (len(margins) - 1)
+        below = int(position)
+        above = min(below + 1, len(margins) - 1)
+        value = margins[below] + (margins[above] - margins[below]) * (position - below)
+        result.append({"percentile": percentile, "margin": float(value)})
+    return result
+
+
+class MarginIndex:
+    """Sorted winning margins for every (year, state, party) filter combination.
+
+    Each combination, with any of the three left open, is one slice of a single flat
+    array sorted within slices, so histograms are a ``searchsorted`` per bin edge and
+    percentiles a direct index instead of a sort of the matching rows.
+    """
+
+    def __init__(self, frame: pd.DataFrame, generation: Optional[str] = None):
+        self.generation = generation
+        frame = frame.sort_values("margin", kind="stable")
+        self.slices: Dict[GroupKey, Tuple[int, int]] = {}
+        chunks: List[np.ndarray] = []
+        size = 0
+        for mask in range(1 << len(FILTERS)):
+            columns = [name for bit, name in enumerate(FILTERS) if mask >> bit & 1]
+            groups = frame.groupby(columns, sort=False, observed=True) if columns else [((), frame)]
+            for values, group in groups:
+                values = values if isinstance(values, tuple) else (values,)
+                named = dict(zip(columns, values))
+                key = tuple(named.get(name) for name in FILTERS)
+                margins = group["margin"].to_numpy(dtype=np.int64)
+                self.slices[key] = (size, size + len(margins))
+                chunks.append(margins)
+                size += len(margins)
+        self.margins = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_database(cls, db: Session, generation: Optional[str] = None) -> "MarginIndex":
+        rows = db.execute(
+            text(
+                "SELECT m.year, s.state_name, p.party, m.margin FROM victory_margins AS m "
+                "JOIN dim_state AS s ON s.state_key = m.state_key "
+                "JOIN dim_party AS p ON p.party_key = m.party_key "
+                "WHERE m.margin IS NOT NULL"
+            )
+        ).all()
+        frame = pd.DataFrame(rows, columns=[*FILTERS, "margin"])
+        return cls(frame, generation)
+
+    @property
+    def nbytes(self) -> int:
+        return self.margins.nbytes
+
+    def lookup(
+        self, year: Optional[int] = None, state: Optional[str] = None, party: Optional[str] = None
+    ) -> np.ndarray:
+        start, end = self.slices.get((year, state, party), (0, 0))
+        return self.margins[start:end]
+
+
+_lock = threading.Lock()
+_index: Optional[MarginIndex] = None
+
+
+def margin_index(db: Session) -> MarginIndex:
+    """The index for the current load generation, rebuilt after a reload."""
+    global _index
+    generation = query_cache.current_generation()
+    with _lock:
+        if _index is None or _index.generation != generation:
+            _index = MarginIndex.from_database(db, generation)
+        return _index
+
+
+def sorted_margins(rows: Iterable) -> np.ndarray:
+    """Sorted margins of ``rows``, leaving out NULLs as ``MarginIndex`` does."""
+    margins = (row["margin"] for row in rows if row["margin"] is not None)
+    return np.sort(np.fromiter(margins, dtype=np.int64))
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from sqlalchemy import Engine, event
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# Name of the queries.py function running in this context; labels its SQL statements.
+current_query: contextvars.ContextVar[str] = contextvars.ContextVar("current_query", default="other")
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Sharded:
+    """Per-thread series, so recording never takes a lock.
+
+    Each thread writes only to its own dict; the lock is held once per thread to
+    register that dict, and scrapes sum across all of them.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, List[float]]] = []
+        self._lock = threading.Lock()
+
+    def _series(self, labels: Labels, size: int) -> List[float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [0.0] * size
+        return series
+
+    def _merged(self) -> Dict[Labels, List[float]]:
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[Labels, List[float]] = {}
+        for shard in shards:
+            for labels, series in list(shard.items()):
+                total = merged.setdefault(labels, [0.0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        return merged
+
+
+class Counter(_Sharded):
+    def inc(self, labels: Labels, amount: float = 1.0) -> None:
+        self._series(labels, 1)[0] += amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        for labels, (value,) in sorted(self._merged().items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {value:g}"
+
+
+class Histogram(_Sharded):
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: Labels, value: float) -> None:
+        # One slot per bucket plus +Inf, then the sum.
+        series = self._series(labels, len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._merged().items()):
+            cumulative = 0.0
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], series):
+                cumulative += count
+                le = _labels(self.label_names, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {cumulative:g}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]:g}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative:g}"
+
+
+request_seconds = Histogram(
+    "elections_http_request_duration_seconds",
+    "Time to produce the response, by route template, method and status.",
+    ["route", "method", "status"],
+    LATENCY_BUCKETS,
+)
+response_bytes = Histogram(
+    "elections_http_response_bytes",
+    "Response body size in bytes, by route template.",
+    ["route"],
+    BYTE_BUCKETS,
+)
+query_seconds = Histogram(
+    "elections_query_duration_seconds",
+    "SQL execution time, by the queries.py function that issued it.",
+    ["query"],
+    LATENCY_BUCKETS,
+)
+query_rows = Histogram(
+    "elections_query_rows",
+    "Rows returned by a queries.py function when computed (cache misses).",
+    ["query"],
+    ROW_BUCKETS,
+)
+query_calls = Counter(
+    "elections_query_calls_total",
+    "queries.py calls, by function and whether the response cache answered them.",
+    ["query", "cache"],
+)
+
+METRICS = [request_seconds, response_bytes, query_seconds, query_rows, query_calls]
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement ``engine`` runs, labelled with the current query function."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started
+        query_seconds.observe((current_query.get(),), elapsed)
+
+
+async def _counted(body: AsyncIterator[bytes], route: str) -> AsyncIterator[bytes]:
+    size = 0
+    async for chunk in body:
+        size += len(chunk)
+        yield chunk
+    response_bytes.observe((route,), size)
+
+
+def _route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    if route is None:
+        # Answered before routing (a 304 from conditional_get): match it here.
+        route = next(
+            (r for r in request.app.router.routes if r.matches(request.scope)[0] == Match.FULL),
+            None,
+        )
+    return getattr(route, "path", "unmatched")
+
+
+async def record_request(request: Request, call_next):
+    """Time each request and size its body, labelled by the matched route template."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = _route_template(request)
+    request_seconds.observe(
+        (route, request.method, str(response.status_code)), time.perf_counter() - started
+    )
+    length = response.headers.get("content-length")
+    if length is not None:
+        response_bytes.observe((route,), int(length))
+    else:
+        response.body_iterator = _counted(response.body_iterator, route)
+    return response
+
+
+def render(cache_stats: Optional[Dict[str, Any]] = None) -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    if cache_stats is not None:
+        for key, kind in [("hits", "counter"), ("misses", "counter"), ("entries", "gauge")]:
+            name = f"elections_query_cache_{key}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {cache_stats[key]}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# A sort key: (SQL expression, result column, descending) per column, ending in a
+# unique column so every row has exactly one position.
+SortKey = Sequence[Tuple[str, str, bool]]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, key: SortKey) -> Tuple[Any, ...]:
+    """Return the key values in ``cursor``; ValueError if it was not issued for ``key``."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as exc:
+        raise ValueError("Malformed cursor.") from exc
+    if not isinstance(values, list) or len(values) != len(key):
+        raise ValueError("Malformed cursor.")
+    if not all(value is None or isinstance(value, (int, float, str)) for value in values):
+        raise ValueError("Malformed cursor.")
+    return tuple(values)
+
+
+def _columns(key: SortKey, fixed: Collection[str]) -> List[Tuple[str, bool, int]]:
+    return [(expr, desc, i) for i, (expr, _, desc) in enumerate(key) if expr not in fixed]
+
+
+def order_by(key: SortKey, fixed: Collection[str] = ()) -> str:
+    return ", ".join(f"{expr} DESC" if desc else expr for expr, desc, _ in _columns(key, fixed))
+
+
+def after_filter(
+    key: SortKey, after: Sequence[Any], fixed: Collection[str] = ()
+) -> Tuple[str, Dict[str, Any]]:
+    """SQL predicate for the rows strictly after ``after`` in ``key`` order, and its params.
+
+    Columns in ``fixed`` are pinned by equality filters and left out, so the predicate
+    lines up with the index serving those filters. An all-ascending key becomes one
+    row-value comparison that SQLite seeks on; mixed directions expand to an OR chain,
+    behind a range on the leading column so SQLite still seeks to the cursor's group.
+    A NULL in ``after`` (the cursor of a row with a NULL sort value) also expands to
+    the OR chain, with NULLs ordered first ascending and last descending as in SQLite.
+    """
+    columns = _columns(key, fixed)
+    if any(after[i] is None for _, _, i in columns):
+        return _after_nulls(columns, after)
+    params = {f"after_{i}": after[i] for _, _, i in columns}
+    if not any(desc for _, desc, _ in columns):
+        exprs = ", ".join(expr for expr, _, _ in columns)
+        values = ", ".join(f":after_{i}" for _, _, i in columns)
+        return f"({exprs}) > ({values})", params
+    terms = []
+    for position, (expr, desc, i) in enumerate(columns):
+        equal = [f"{e} = :after_{j}" for e, _, j in columns[:position]]
+        terms.append(" AND ".join(equal + [f"{expr} {'<' if desc else '>'} :after_{i}"]))
+    lead, desc, i = columns[0]
+    chain = " OR ".join(f"({term})" for term in terms)
+    return f"{lead} {'<=' if desc else '>='} :after_{i} AND ({chain})", params
+
+
+def _after_nulls(
+    columns: List[Tuple[str, bool, int]], after: Sequence[Any]
+) -> Tuple[str, Dict[str, Any]]:
+    params: Dict[str, Any] = {}
+    equal: List[str] = []
+    terms = []
+    for expr, desc, i in columns:
+        if after[i] is None:
+            # Non-NULL values follow a NULL ascending; nothing follows it descending.
+            if not desc:
+                terms.append(" AND ".join(equal + [f"{expr} IS NOT NULL"]))
+            equal.append(f"{expr} IS NULL")
+        else:
+            params[f"after_{i}"] = after[i]
+            terms.append(" AND ".join(equal + [f"{expr} {'<' if desc else '>'} :after_{i}"]))
+            equal.append(f"{expr} = :after_{i}")
+    return "(" + " OR ".join(f"({term})" for term in terms) + ")", params
+
+
+def split_page(
+    rows: Sequence[Mapping], limit: Optional[int], key: SortKey
+) -> Tuple[Sequence[Mapping], Optional[str]]:
+    """Trim ``rows`` (fetched with ``limit + 1``) to a page and the cursor for the next one."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([rows[-1][column] for _, column, _ in key])
@@ -1,164 +1,315 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import json
+from typing import Any, List, Optional, Tuple
 
 from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
+from .cache import cached
+from .filters import Filters, IntFilter, StrFilter, padded, statement, values
+from .pagination import SortKey, after_filter, order_by
+
+# Trigrams need three characters; shorter searches fall back to LIKE.
+SEARCH_MIN_CHARS = 3
+
+# seat_cube grouping_id values (see SEAT_CUBE_ROLLUPS in scripts/load_data.py):
+# bit 0 set when gender is summed over, bit 1 when constituency_type is.
+SEAT_CUBE_BY_GENDER = 2
+SEAT_CUBE_TOTAL = 3
+
+# Keyset pagination orders, each ending in a unique column. Extra key columns are
+# returned alongside the documented fields so the next cursor can be built.
+SEAT_SHARE_KEY: SortKey = (
+    ("s.year", "year", False),
+    ("s.seats", "seats", True),
+    ("s.party_key", "party_key", False),
+    ("s.state_key", "state_key", False),
+)
+TURNOUT_KEY: SortKey = (
+    ("year", "year", False),
+    ("turnout_pct", "turnout_pct", True),
+    ("state_name", "state_name", False),
+)
+# Matches every idx_victory_margins_* index once its equality-filtered column is
+# dropped, so each page is an index seek rather than a skip over earlier pages.
+MARGIN_KEY: SortKey = (
+    ("m.margin", "margin", False),
+    ("m.year", "year", False),
+    ("m.state_key", "state_key", False),
+    ("m.constituency_key", "constituency_key", False),
+    ("m.party_key", "party_key", False),
+    ("m.rowid", "row_id", False),
+)
+
 
 def _collect_list(db: Session, sql: str):
     rows = db.execute(text(sql)).all()
     return [row[0] for row in rows if row[0] is not None]
 
 
-def get_filters(db: Session):
+def _filters_from_tables(db: Session):
     return {
-        "years": sorted(_collect_list(db, "SELECT DISTINCT year FROM candidates")),
-        "states": sorted(_collect_list(db, "SELECT DISTINCT state_name FROM candidates")),
-        "parties": sorted(_collect_list(db, "SELECT DISTINCT party FROM candidates")),
-        "genders": sorted(_collect_list(db, "SELECT DISTINCT gender FROM candidates")),
-        "constituencies": sorted(
-            _collect_list(db, "SELECT DISTINCT constituency_name FROM candidates")
+        "years": sorted(_collect_list(db, "SELECT DISTINCT year FROM gender_representation")),
+        "states": _collect_list(db, "SELECT state_name FROM dim_state ORDER BY state_name"),
+        "parties": _collect_list(db, "SELECT party FROM dim_party ORDER BY party"),
+        "genders": sorted(_collect_list(db, "SELECT DISTINCT gender FROM gender_representation")),
+        "constituencies": _collect_list(
+            db, "SELECT constituency_name FROM dim_constituency ORDER BY constituency_name"
         ),
+        "partitions": [],
     }
 
 
+@cached
+def _filters_snapshot(db: Session):
+    """The filter catalogue written by the loader, or one read from the tables for
+    databases loaded before it existed (those cannot cascade)."""
+    try:
+        value = db.execute(
+            text("SELECT value FROM load_metadata WHERE key = 'filters'")
+        ).scalar()
+    except OperationalError:
+        value = None
+    return json.loads(value) if value else _filters_from_tables(db)
+
+
+@cached
+def get_filters(db: Session, state: Optional[str] = None, year: Optional[int] = None):
+    snapshot = _filters_snapshot(db)
+    result = {key: snapshot[key] for key in ["years", "states", "parties", "genders", "constituencies"]}
+    if not (state or year) or not snapshot["partitions"]:
+        return result
+    state_position = snapshot["states"].index(state) if state in snapshot["states"] else None
+    # Each facet is narrowed by the other one only, so a state and year that never
+    # occur together still list the years of that state and the states of that year.
+    years, states, parties, constituencies = set(), set(), set(), set()
+    for partition in snapshot["partitions"]:
+        in_state = not state or partition["state"] == state_position
+        in_year = not year or partition["year"] == year
+        if in_state:
+            years.add(partition["year"])
+        if in_year:
+            states.add(partition["state"])
+        if not (in_state and in_year):
+            continue
+        parties.update(partition["parties"])
+        constituencies.update(partition["constituencies"])
+    if state:
+        result["years"] = sorted(years)
+    if year:
+        result["states"] = [snapshot["states"][i] for i in sorted(states)]
+    result["parties"] = [snapshot["parties"][i] for i in sorted(parties)]
+    result["constituencies"] = [snapshot["constituencies"][i] for i in sorted(constituencies)]
+    return result
+
+
+@cached
 def party_seat_share(
     db: Session,
-    year: Optional[int] = None,
-    state: Optional[str] = None,
-    parties: Optional[List[str]] = None,
-    gender: Optional[str] = None,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    parties: StrFilter = None,
+    gender: StrFilter = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, ...]] = None,
 ):
+    # seat_cube rows with constituency_type summed over, and gender too unless filtered.
     sql = """
-        SELECT year, party, state_name, COUNT(*) AS seats
-        FROM candidates
-        WHERE is_winner = 1
+        SELECT s.year, p.party, st.state_name, s.seats, s.party_key, s.state_key
+        FROM {source}
+        JOIN dim_party AS p ON p.party_key = s.party_key
+        JOIN dim_state AS st ON st.state_key = s.state_key
+        {where}
+        ORDER BY {order}
     """
-    params = {}
-    filters = []
-    if year:
-        filters.append("year = :year")
-        params["year"] = year
-    if state:
-        filters.append("state_name = :state_name")
-        params["state_name"] = state
-    if parties:
-        filters.append("party IN :parties")
-        params["parties"] = tuple(parties)
-    if gender:
-        filters.append("gender = :gender")
-        params["gender"] = gender
-    if filters:
-        sql += " AND " + " AND ".join(filters)
-    sql += " GROUP BY year, party, state_name ORDER BY year, seats DESC"
-    result = db.execute(text(sql), params).mappings().all()
-    return result
+    genders = values(gender)
+    filters = Filters(
+        "s.grouping_id = :grouping_id",
+        grouping_id=SEAT_CUBE_BY_GENDER if genders else SEAT_CUBE_TOTAL,
+    )
+    if genders:
+        filters.equal("s.gender", "gender", genders)
+    else:
+        filters.add("s.gender IS NULL")
+    filters.equal("s.year", "year", year)
+    filters.lookup("s.state_key", "state_name", state, "dim_state", "state_key", "state_name")
+    filters.lookup("s.party_key", "parties", parties, "dim_party", "party_key", "party")
+    if genders and len(genders) > 1:
+        # One cube row per gender: add them back up to one per (year, party, state).
+        source = (
+            "(SELECT s.year, s.party_key, s.state_key, SUM(s.seats) AS seats "
+            f"FROM seat_cube AS s WHERE {filters.sql()} "
+            "GROUP BY s.year, s.party_key, s.state_key) AS s"
+        )
+        where = []
+    else:
+        source = "seat_cube AS s"
+        where = [filters.sql()]
+    if after:
+        predicate, after_params = after_filter(SEAT_SHARE_KEY, after, filters.fixed)
+        where.append(predicate)
+        filters.params.update(after_params)
+    sql = sql.format(
+        source=source,
+        where=f"WHERE {' AND '.join(where)}" if where else "",
+        order=order_by(SEAT_SHARE_KEY, filters.fixed),
+    )
+    if limit:
+        sql += " LIMIT :limit"
+        filters.params["limit"] = limit + 1
+    return db.execute(filters.statement(sql), filters.params).mappings().all()
 
 
-def state_turnout(db: Session, year: Optional[int] = None, state: Optional[str] = None):
+@cached
+def state_turnout(
+    db: Session,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, ...]] = None,
+):
     sql = "SELECT year, state_name, turnout_pct, electors, valid_votes FROM state_turnout"
-    params = {}
-    filters = []
-    if year:
-        filters.append("year = :year")
-        params["year"] = year
-    if state:
-        filters.append("state_name = :state_name")
-        params["state_name"] = state
-    if filters:
-        sql += " WHERE " + " AND ".join(filters)
-    sql += " ORDER BY year, turnout_pct DESC"
-    return db.execute(text(sql), params).mappings().all()
+    filters = Filters().equal("year", "year", year).equal("state_name", "state_name", state)
+    if after:
+        predicate, after_params = after_filter(TURNOUT_KEY, after, filters.fixed)
+        filters.add(predicate, **after_params)
+    sql += filters.where() + f" ORDER BY {order_by(TURNOUT_KEY, filters.fixed)}"
+    if limit:
+        sql += " LIMIT :limit"
+        filters.params["limit"] = limit + 1
+    return db.execute(filters.statement(sql), filters.params).mappings().all()
 
 
-def gender_representation(db: Session, year: Optional[int] = None):
+@cached
+def gender_representation(db: Session, year: IntFilter = None):
     sql = "SELECT year, gender, total_candidates, total_winners FROM gender_representation"
-    params = {}
-    if year:
-        sql += " WHERE year = :year"
-        params["year"] = year
-    sql += " ORDER BY year, gender"
-    return db.execute(text(sql), params).mappings().all()
+    filters = Filters().equal("year", "year", year)
+    sql += filters.where() + " ORDER BY year, gender"
+    return db.execute(filters.statement(sql), filters.params).mappings().all()
 
 
+@cached
 def top_vote_share(db: Session, year: int, limit: int = 5):
     sql = """
-        WITH totals AS (
-            SELECT total_votes,
-                   SUM(total_votes) OVER (PARTITION BY year) AS year_total,
-                   party,
-                   year
-            FROM party_vote_share
-            WHERE year = :year
-        )
-        SELECT party, year, total_votes, (total_votes * 100.0 / year_total) AS vote_pct
-        FROM totals
+        SELECT party,
+               year,
+               total_votes,
+               total_votes * 100.0 / (
+                   SELECT SUM(total_votes) FROM party_vote_share WHERE year = :year
+               ) AS vote_pct
+        FROM party_vote_share
+        WHERE year = :year
         ORDER BY total_votes DESC
         LIMIT :limit
     """
-    return db.execute(text(sql), {"year": year, "limit": limit}).mappings().all()
+    return db.execute(statement(sql), {"year": year, "limit": limit}).mappings().all()
 
 
+@cached
 def margin_distribution(
     db: Session,
-    year: Optional[int] = None,
-    state: Optional[str] = None,
-    constituency: Optional[str] = None,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    constituency: StrFilter = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[Any, ...]] = None,
 ):
-    sql = "SELECT year, state_name, constituency_name, party, margin FROM victory_margins"
-    params = {}
-    filters = []
-    if year:
-        filters.append("year = :year")
-        params["year"] = year
-    if state:
-        filters.append("state_name = :state_name")
-        params["state_name"] = state
-    if constituency:
-        filters.append("constituency_name = :constituency")
-        params["constituency"] = constituency
-    if filters:
-        sql += " WHERE " + " AND ".join(filters)
-    sql += " ORDER BY margin ASC"
-    return db.execute(text(sql), params).mappings().all()
+    sql = """
+        SELECT m.year, s.state_name, c.constituency_name, p.party, m.margin,
+               m.state_key, m.constituency_key, m.party_key, m.rowid AS row_id
+        FROM victory_margins AS m
+        JOIN dim_state AS s ON s.state_key = m.state_key
+        JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key
+        JOIN dim_party AS p ON p.party_key = m.party_key
+    """
+    filters = (
+        Filters()
+        .equal("m.year", "year", year)
+        .lookup("m.state_key", "state_name", state, "dim_state", "state_key", "state_name")
+        .lookup(
+            "m.constituency_key",
+            "constituency",
+            constituency,
+            "dim_constituency",
+            "constituency_key",
+            "constituency_name",
+        )
+    )
+    if after:
+        predicate, after_params = after_filter(MARGIN_KEY, after, filters.fixed)
+        filters.add(predicate, **after_params)
+    sql += filters.where() + f" ORDER BY {order_by(MARGIN_KEY, filters.fixed)}"
+    if limit:
+        sql += " LIMIT :limit"
+        filters.params["limit"] = limit + 1
+    return db.execute(filters.statement(sql), filters.params).mappings().all()
 
 
+@cached
 def search_candidates(
     db: Session,
     query: str,
-    year: Optional[int] = None,
-    state: Optional[str] = None,
-    party: Optional[str] = None,
-    gender: Optional[str] = None,
-    constituency: Optional[str] = None,
+    year: IntFilter = None,
+    state: StrFilter = None,
+    party: StrFilter = None,
+    gender: StrFilter = None,
+    constituency: StrFilter = None,
     limit: int = 20,
 ):
     sql = """
-        SELECT year, state_name, constituency_name, candidate_name, party, gender, position, votes, margin
-        FROM candidate_lookup
-        WHERE (candidate_name LIKE :query OR constituency_name LIKE :query)
+        SELECT l.year, s.state_name, c.constituency_name, l.candidate_name, p.party, l.gender,
+               l.position, l.votes, l.margin
+        FROM {source}
+        JOIN dim_state AS s ON s.state_key = l.state_key
+        JOIN dim_constituency AS c ON c.constituency_key = l.constituency_key
+        JOIN dim_party AS p ON p.party_key = l.party_key
+        WHERE {filters}
+        ORDER BY {order}
+        LIMIT :limit
     """
-    params = {"query": f"%{query}%", "limit": limit}
-    if year:
-        sql += " AND year = :year"
-        params["year"] = year
-    if state:
-        sql += " AND state_name = :state_name"
-        params["state_name"] = state
-    if party:
-        sql += " AND party = :party"
-        params["party"] = party
-    if gender:
-        sql += " AND gender = :gender"
-        params["gender"] = gender
-    if constituency:
-        sql += " AND constituency_name = :constituency"
-        params["constituency"] = constituency
-    sql += " ORDER BY year DESC LIMIT :limit"
-    return db.execute(text(sql), params).mappings().all()
+    if len(query) >= SEARCH_MIN_CHARS:
+        # Quoted as one FTS5 phrase, so the trigram index matches it as a substring.
+        filters = Filters(
+            "candidate_search MATCH :query", query='"' + query.replace('"', '""') + '"', limit=limit
+        )
+        source = "candidate_search AS f JOIN candidate_lookup AS l ON l.rowid = f.rowid"
+        order = "f.rank, l.year DESC, l.rowid"
+    else:
+        filters = Filters(
+            "(l.candidate_name LIKE :query OR c.constituency_name LIKE :query)",
+            query=f"%{query}%",
+            limit=limit,
+        )
+        source = "candidate_lookup AS l"
+        order = "l.year DESC, l.rowid"
+    filters.equal("l.year", "year", year)
+    filters.equal("s.state_name", "state_name", state)
+    filters.equal("p.party", "party", party)
+    filters.equal("l.gender", "gender", gender)
+    filters.equal("c.constituency_name", "constituency", constituency)
+    sql = sql.format(source=source, filters=filters.sql(), order=order)
+    return db.execute(filters.statement(sql), filters.params).mappings().all()
 
 
+def candidates_by_rowid(db: Session, rowids: List[int]):
+    if not rowids:
+        return {}
+    sql = """
+        SELECT l.rowid, l.year, s.state_name, c.constituency_name, l.candidate_name, p.party,
+               l.gender, l.position, l.votes, l.margin
+        FROM candidate_lookup AS l
+        JOIN dim_state AS s ON s.state_key = l.state_key
+        JOIN dim_constituency AS c ON c.constituency_key = l.constituency_key
+        JOIN dim_party AS p ON p.party_key = l.party_key
+        WHERE l.rowid IN :rowids
+    """
+    rows = db.execute(statement(sql, ("rowids",)), {"rowids": padded(rowids)}).mappings().all()
+    return {row["rowid"]: row for row in rows}
+
+
+@cached
 def highest_turnout(db: Session):
     sql = """
         SELECT state_name, turnout_pct, year
@@ -167,19 +318,65 @@ def highest_turnout(db: Session):
         ORDER BY turnout_pct DESC
         LIMIT 1
     """
-    return db.execute(text(sql)).mappings().first()
+    return db.execute(statement(sql)).mappings().first()
 
 
+@cached
 def biggest_seat_change(db: Session):
     sql = """
-        SELECT party, year, seat_change
-        FROM party_year_delta
-        ORDER BY ABS(seat_change) DESC
+        SELECT p.party, d.year, d.seat_change
+        FROM party_year_delta AS d
+        JOIN dim_party AS p ON p.party_key = d.party_key
+        WHERE d.state_key IS NULL
+        ORDER BY ABS(d.seat_change) DESC
         LIMIT 1
     """
-    return db.execute(text(sql)).mappings().first()
+    return db.execute(statement(sql)).mappings().first()
+
+
+def _seat_swings(db: Session, state: StrFilter, year: IntFilter, limit: int, gains: bool):
+    """The largest seat gains (or losses) between consecutive elections, all-India
+    unless ``state`` is given; both directions walk the same index."""
+    sql = """
+        SELECT p.party, st.state_name, d.year, d.prev_year, d.seats, d.prev_seats,
+               d.seat_change, d.vote_share_pct, d.prev_vote_share_pct, d.vote_share_change
+        FROM party_year_delta AS d
+        JOIN dim_party AS p ON p.party_key = d.party_key
+        {join} dim_state AS st ON st.state_key = d.state_key
+        WHERE {filters}
+        ORDER BY {order}
+        LIMIT :limit
+    """
+    filters = Filters("d.seat_change > 0" if gains else "d.seat_change < 0", limit=limit)
+    # Joining on the state name (rather than a scalar subquery) lets SQLite start
+    # from dim_state and seek the delta index on its key.
+    states = values(state)
+    if states:
+        filters.equal("st.state_name", "state_name", states)
+    else:
+        filters.add("d.state_key IS NULL")
+    filters.equal("d.year", "year", year)
+    order = ["d.seat_change", "d.vote_share_change", "d.year", "d.party_key"]
+    direction = " DESC" if gains else ""
+    sql = sql.format(
+        join="JOIN" if states else "LEFT JOIN",
+        filters=filters.sql(),
+        order=", ".join(column + direction for column in order if column not in filters.fixed),
+    )
+    return db.execute(filters.statement(sql), filters.params).mappings().all()
+
+
+@cached
+def top_gainers(db: Session, state: StrFilter = None, year: IntFilter = None, limit: int = 5):
+    return _seat_swings(db, state, year, limit, gains=True)
+
+
+@cached
+def top_losers(db: Session, state: StrFilter = None, year: IntFilter = None, limit: int = 5):
+    return _seat_swings(db, state, year, limit, gains=False)
 
 
+@cached
 def women_participation(db: Session):
     sql = """
         WITH totals AS (
@@ -191,20 +388,24 @@ def women_participation(db: Session):
         SELECT (SELECT total FROM totals WHERE gender = 'F') * 100.0 / SUM(total) AS percentage
         FROM totals
     """
-    return db.execute(text(sql)).mappings().first()
+    return db.execute(statement(sql)).mappings().first()
 
 
+@cached
 def closest_margins(db: Session, limit: int = 5):
     sql = """
-        SELECT constituency_name, state_name, year, margin
-        FROM victory_margins
-        WHERE margin > 0
-        ORDER BY margin ASC
+        SELECT c.constituency_name, s.state_name, m.year, m.margin
+        FROM victory_margins AS m
+        JOIN dim_state AS s ON s.state_key = m.state_key
+        JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key
+        WHERE m.margin > 0
+        ORDER BY m.margin ASC
         LIMIT :limit
     """
-    return db.execute(text(sql), {"limit": limit}).mappings().all()
+    return db.execute(statement(sql), {"limit": limit}).mappings().all()
 
 
+@cached
 def vote_share_trend(db: Session):
     sql = """
         WITH classified AS (
@@ -233,24 +434,26 @@ def vote_share_trend(db: Session):
         JOIN totals t ON c.year = t.year
         ORDER BY c.year, c.category
     """
-    return db.execute(text(sql)).mappings().all()
+    return db.execute(statement(sql)).mappings().all()
 
 
+@cached
 def education_win_rate(db: Session):
     sql = """
         WITH summary AS (
-            SELECT education,
+            SELECT education_key,
                    COUNT(*) AS candidates,
                    SUM(CASE WHEN is_winner = 1 THEN 1 ELSE 0 END) AS winners
             FROM candidates
-            WHERE education IS NOT NULL
-            GROUP BY education
+            WHERE education_key IS NOT NULL
+            GROUP BY education_key
             HAVING candidates >= 50
         )
-        SELECT education, winners * 100.0 / candidates AS win_rate
-        FROM summary
+        SELECT e.education, s.winners * 100.0 / s.candidates AS win_rate
+        FROM summary AS s
+        JOIN dim_education AS e ON e.education_key = s.education_key
         ORDER BY win_rate DESC
         LIMIT 10
     """
-    return db.execute(text(sql)).mappings().all()
+    return db.execute(statement(sql)).mappings().all()
 
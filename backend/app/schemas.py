@@ -39,7 +39,28 @@ class MarginRecord(BaseModel):
     state_name: str
     constituency_name: str
     party: str
-    margin: int
+    margin: Optional[int]
+
+
+class MarginBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class MarginHistogram(BaseModel):
+    count: int
+    bins: List[MarginBin]
+
+
+class MarginQuantile(BaseModel):
+    percentile: float
+    margin: float
+
+
+class MarginQuantiles(BaseModel):
+    count: int
+    quantiles: List[MarginQuantile]
 
 
 class CandidateLookup(BaseModel):
@@ -54,6 +75,10 @@ class CandidateLookup(BaseModel):
     margin: Optional[int]
 
 
+class FuzzyCandidate(CandidateLookup):
+    score: float
+
+
 class FiltersResponse(BaseModel):
     years: List[int]
     states: List[str]
@@ -74,6 +99,19 @@ class SeatChangeAnswer(BaseModel):
     seat_change: int
 
 
+class SeatSwing(BaseModel):
+    party: str
+    state_name: Optional[str]
+    year: int
+    prev_year: int
+    seats: int
+    prev_seats: int
+    seat_change: int
+    vote_share_pct: float
+    prev_vote_share_pct: float
+    vote_share_change: float
+
+
 class WomenParticipationAnswer(BaseModel):
     percentage: float
 
@@ -95,3 +133,24 @@ class EducationWinRateAnswer(BaseModel):
     education: str
     win_rate: float
 
+
+class DashboardResponse(BaseModel):
+    seat_share: List[PartySeatShare]
+    state_turnout: List[StateTurnout]
+    gender_representation: List[GenderRepresentation]
+    top_vote_share: List[VoteShare]
+    margin_histogram: List[MarginBin]
+    highest_turnout: Optional[TurnoutAnswer]
+    seat_change: Optional[SeatChangeAnswer]
+    women: Optional[WomenParticipationAnswer]
+    close_margins: List[CloseContestAnswer]
+    vote_trend: List[VoteShareTrendAnswer]
+    education: List[EducationWinRateAnswer]
+
+
+class CacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    generation: Optional[str]
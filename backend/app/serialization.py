@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import functools
+from typing import Iterable, List, Mapping, Tuple, Type, Union, get_args, get_origin
+
+import orjson
+from pydantic import BaseModel
+
+
+@functools.lru_cache(maxsize=None)
+def _fields(model: Type[BaseModel]) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+    """Field names of ``model`` in declaration order, and those declared as float and as int."""
+    names, floats, ints = [], [], []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if get_origin(annotation) is Union:
+            annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+        names.append(name)
+        if annotation is float:
+            floats.append(name)
+        elif annotation is int:
+            ints.append(name)
+    return tuple(names), tuple(floats), tuple(ints)
+
+
+def encode_rows(rows: Iterable[Mapping], model: Type[BaseModel]) -> bytes:
+    """JSON for ``rows`` shaped like ``List[model]``, without building a model per row.
+
+    Keys are the model's fields in order. Numbers are coerced to the declared type as
+    Pydantic's lax mode does: SQLite integers in float fields are written as floats,
+    and REAL values in int fields (a nullable column loaded as FLOAT) as integers.
+    Anything else must already have the declared type: ``tests/test_json_contract.py``
+    verifies that for every endpoint that uses this path.
+    """
+    names, floats, ints = _fields(model)
+    payload: List[dict] = []
+    append = payload.append
+    for row in rows:
+        item = {name: row[name] for name in names}
+        for name in floats:
+            if item[name] is not None:
+                item[name] = float(item[name])
+        for name in ints:
+            if item[name] is not None:
+                item[name] = int(item[name])
+        append(item)
+    return orjson.dumps(payload)
@@ -0,0 +1,383 @@
+"""Latency benchmarks for the API queries.
+
+Each subcommand builds (or reuses) a database from the raw CSV, optionally
+scaled up, and prints latency percentiles for the variants it compares::
+
+    python backend/scripts/benchmarks.py --scale 10 search
+    python backend/scripts/benchmarks.py --scale 1 cache
+    python backend/scripts/benchmarks.py --db data/elections.db pool --threads 1 4 8
+    python backend/scripts/benchmarks.py --db data/elections.db json
+    python backend/scripts/benchmarks.py --db data/elections.db pages
+    python backend/scripts/benchmarks.py --db data/elections.db engines
+"""
+from __future__ import annotations
+
+import argparse
+import inspect
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.app import queries  # noqa: E402
+from backend.scripts.load_data import RAW_DATA, load_database  # noqa: E402
+
+
+def _scaled_csv(csv_path: Path, scale: int, out_dir: Path) -> Path:
+    """Repeat the raw rows ``scale`` times as distinct constituencies."""
+    if scale == 1:
+        return csv_path
+    raw = pd.read_csv(csv_path, low_memory=False)
+    copies = []
+    for copy in range(scale):
+        frame = raw.copy()
+        if copy:
+            frame["Constituency_No"] = frame["Constituency_No"] + copy * 10_000
+            frame["Constituency_Name"] = frame["Constituency_Name"].astype(str) + f" {copy}"
+        copies.append(frame)
+    path = out_dir / f"scaled_x{scale}.csv"
+    pd.concat(copies, ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+def _database(args, out_dir: Path) -> Path:
+    if args.db and args.db.exists():
+        return args.db
+    db_path = args.db or out_dir / f"bench_x{args.scale}.db"
+    started = time.perf_counter()
+    load_database(_scaled_csv(args.csv, args.scale, out_dir), db_path)
+    print(f"Built {db_path} in {time.perf_counter() - started:.1f}s")
+    return db_path
+
+
+def _percentiles(samples: List[float]) -> str:
+    p50, p95, p99 = np.percentile(np.array(samples) * 1000, [50, 95, 99])
+    return f"p50 {p50:8.2f}ms  p95 {p95:8.2f}ms  p99 {p99:8.2f}ms"
+
+
+def _time_calls(calls: List[Callable[[], object]], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        for call in calls:
+            started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _search_terms(db: Session, count: int, seed: int) -> List[str]:
+    names = db.execute(text("SELECT DISTINCT candidate_name FROM candidate_lookup")).scalars().all()
+    rng = random.Random(seed)
+    terms = []
+    while len(terms) < count:
+        name = rng.choice(names)
+        size = rng.randint(3, 6)
+        if len(name) >= size:
+            start = rng.randint(0, len(name) - size)
+            terms.append(name[start:start + size])
+    return terms
+
+
+def bench_search(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{_database(args, Path(tmp))}", future=True)
+        with Session(engine) as db:
+            rows = db.execute(text("SELECT COUNT(*) FROM candidate_lookup")).scalar()
+            terms = _search_terms(db, args.terms, args.seed)
+            search = inspect.unwrap(queries.search_candidates)
+            filters: List[Dict] = [{}, {"year": db.execute(text("SELECT MAX(year) FROM candidates")).scalar()}]
+            calls = [
+                lambda term=term, kwargs=kwargs: search(db, term, **kwargs)
+                for term in terms
+                for kwargs in filters
+            ]
+            print(f"{rows:,} searchable rows, {len(calls)} searches x {args.repeat}")
+            results = {}
+            for label, min_chars in [("LIKE scan", sys.maxsize), ("FTS5 trigram", queries.SEARCH_MIN_CHARS)]:
+                original, queries.SEARCH_MIN_CHARS = queries.SEARCH_MIN_CHARS, min_chars
+                try:
+                    results[label] = _time_calls(calls, args.repeat)
+                finally:
+                    queries.SEARCH_MIN_CHARS = original
+            for label, samples in results.items():
+                print(f"{label:<14} {_percentiles(samples)}")
+
+
+def _dashboard_requests(db: Session) -> List[Tuple[str, Dict]]:
+    year = db.execute(text("SELECT MAX(year) FROM candidates")).scalar()
+    return [
+        ("/filters", {}),
+        ("/party-seat-share", {"year": year}),
+        ("/state-turnout", {"year": year}),
+        ("/gender-representation", {"year": year}),
+        ("/top-vote-share", {"year": year}),
+        ("/margin-distribution", {"year": year}),
+        ("/analytics/highest-turnout", {}),
+        ("/analytics/seat-change", {}),
+        ("/analytics/women-participation", {}),
+        ("/analytics/close-margins", {}),
+        ("/analytics/vote-share-trend", {}),
+        ("/analytics/education-win-rate", {}),
+    ]
+
+
+def bench_cache(args) -> None:
+    from fastapi.testclient import TestClient
+
+    from backend.app.cache import query_cache
+    from backend.app.database import ReadOnlySession
+    from backend.app.main import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{_database(args, Path(tmp))}",
+            connect_args={"check_same_thread": False},
+            future=True,
+        )
+        ReadOnlySession.configure(bind=engine)
+        client = TestClient(app)
+        with Session(engine) as db:
+            requests = _dashboard_requests(db)
+
+        def dashboard_load():
+            for path, params in requests:
+                client.get(path, params=params).raise_for_status()
+
+        def cold_load():
+            query_cache.clear()
+            dashboard_load()
+
+        print(f"Dashboard load = {len(requests)} requests, x {args.repeat * 10}")
+        cold = _time_calls([cold_load], args.repeat * 10)
+        dashboard_load()
+        warm = _time_calls([dashboard_load], args.repeat * 10)
+        print(f"{'uncached':<14} {_percentiles(cold)}")
+        print(f"{'cached':<14} {_percentiles(warm)}")
+        print(f"cache stats: {query_cache.stats()}")
+
+
+def _query_mix(db: Session) -> List[Callable[[Session], object]]:
+    year = db.execute(text("SELECT MAX(year) FROM candidates")).scalar()
+    unwrap = lambda name: inspect.unwrap(getattr(queries, name))  # noqa: E731
+    return [
+        lambda db: unwrap("party_seat_share")(db, year=year),
+        lambda db: unwrap("state_turnout")(db, year=year),
+        lambda db: unwrap("top_vote_share")(db, year, 5),
+        lambda db: unwrap("margin_distribution")(db, year=year),
+        lambda db: unwrap("highest_turnout")(db),
+        lambda db: unwrap("closest_margins")(db),
+        lambda db: unwrap("search_candidates")(db, "sing"),
+    ]
+
+
+def bench_pool(args) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.app.database import create_readonly_engine
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = _database(args, Path(tmp))
+        with Session(create_engine(f"sqlite:///{db_path}", future=True)) as db:
+            mix = _query_mix(db)
+        variants = [
+            ("default", lambda threads: create_engine(
+                f"sqlite:///{db_path}", connect_args={"check_same_thread": False}, future=True
+            )),
+            ("serving", lambda threads: create_readonly_engine(
+                db_path, immutable=True, pool_size=threads
+            )),
+        ]
+        calls = len(mix) * args.repeat * 4
+        print(f"{calls} uncached queries per run, {os.cpu_count()} CPU(s)")
+        for threads in args.threads:
+            for label, make_engine in variants:
+                engine = make_engine(threads)
+
+                def worker(index: int) -> None:
+                    with Session(engine) as db:
+                        for call in range(index, calls, threads):
+                            mix[call % len(mix)](db)
+
+                with ThreadPoolExecutor(threads) as pool:
+                    list(pool.map(worker, range(threads)))  # opens and warms connections
+                    started = time.perf_counter()
+                    list(pool.map(worker, range(threads)))
+                    elapsed = time.perf_counter() - started
+                engine.dispose()
+                print(f"{label:<8} {threads:>3} threads  {calls / elapsed:8.1f} queries/s")
+
+
+def bench_json(args) -> None:
+    from fastapi.responses import JSONResponse
+    from fastapi.testclient import TestClient
+    from pydantic import TypeAdapter
+
+    from backend.app import main as api, schemas
+    from backend.app.cache import query_cache
+    from backend.app.database import ReadOnlySession, create_readonly_engine
+    from backend.app.serialization import encode_rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = _database(args, Path(tmp))
+        ReadOnlySession.configure(bind=create_readonly_engine(db_path))
+        with ReadOnlySession() as db:
+            workloads = [
+                (schemas.MarginRecord, inspect.unwrap(queries.margin_distribution)(db)),
+                (schemas.CandidateLookup, inspect.unwrap(queries.search_candidates)(db, "an", limit=10_000)),
+            ]
+        print(f"Serialization of 10,000 rows x {args.repeat * 10}")
+        for model, rows in workloads:
+            rows = (list(rows) * (10_000 // len(rows) + 1))[:10_000]
+            adapter = TypeAdapter(List[model])
+
+            def pydantic_path(model=model, rows=rows, adapter=adapter):
+                # What a handler plus FastAPI's response_model handling does.
+                content = [model(**row) for row in rows]
+                validated = adapter.validate_python(content, from_attributes=True)
+                return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+            for label, call in [
+                ("models", pydantic_path),
+                ("orjson", lambda model=model, rows=rows: encode_rows(rows, model)),
+            ]:
+                samples = _time_calls([call], args.repeat * 10)
+                print(f"{model.__name__:<16} {label:<7} {_percentiles(samples)}")
+
+        client = TestClient(api.app)
+        print("GET /margin-distribution (all winners), uncached")
+        for label, fast in [("models", False), ("orjson", True)]:
+            api.FAST_JSON = fast
+
+            def request():
+                query_cache.clear()
+                client.get("/margin-distribution").raise_for_status()
+
+            print(f"{label:<24} {_percentiles(_time_calls([request], args.repeat * 4))}")
+
+
+def bench_pages(args) -> None:
+    from backend.app.pagination import decode_cursor, split_page
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{_database(args, Path(tmp))}", future=True)
+        with Session(engine) as db:
+            year = db.execute(text("SELECT MAX(year) FROM candidates")).scalar()
+            for name, key, kwargs in [
+                ("margin_distribution", queries.MARGIN_KEY, {}),
+                ("margin_distribution", queries.MARGIN_KEY, {"year": year}),
+                ("party_seat_share", queries.SEAT_SHARE_KEY, {}),
+                ("state_turnout", queries.TURNOUT_KEY, {}),
+            ]:
+                query = inspect.unwrap(getattr(queries, name))
+                # Walk every page once to collect the cursors, then time a sample of them.
+                after, cursors = None, []
+                while True:
+                    cursors.append(after)
+                    rows = query(db, limit=args.page_size, after=after, **kwargs)
+                    _, cursor = split_page(rows, args.page_size, key)
+                    if cursor is None:
+                        break
+                    after = decode_cursor(cursor, key)
+                label = ", ".join(f"{k}={v}" for k, v in kwargs.items())
+                print(f"{name}({label}): {len(cursors)} pages of {args.page_size}")
+                picks = [("first", cursors[0]), ("middle", cursors[len(cursors) // 2]), ("last", cursors[-1])]
+                for label, after in picks:
+                    call = lambda after=after: query(db, limit=args.page_size, after=after, **kwargs)  # noqa: E731
+                    samples = _time_calls([call], args.repeat * 10)
+                    print(f"  {label:<7} {_percentiles(samples)}")
+
+
+def bench_engines(args) -> None:
+    from backend.app import columnar, duckdb_engine
+    from backend.app.database import ReadOnlySession, create_readonly_engine
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = _database(args, Path(tmp))
+        ReadOnlySession.configure(bind=create_readonly_engine(db_path))
+        duckdb_engine.parquet_dir = db_path.with_suffix(".parquet")
+        engines = [("sql", queries), ("numpy", columnar)]
+        if duckdb_engine.available():
+            engines.append(("duckdb", duckdb_engine))
+        else:
+            print(f"Skipping DuckDB: {duckdb_engine._unavailable()}")
+        with ReadOnlySession() as db:
+            started = time.perf_counter()
+            store = columnar.columnar_store(db)
+            elapsed = time.perf_counter() - started
+            print(f"Columnar store: loaded in {elapsed:.2f}s, {store.nbytes / 1e6:.1f} MB")
+            year = int(store.years[-1])
+            state = db.execute(text("SELECT state_name FROM dim_state ORDER BY state_key LIMIT 1")).scalar()
+            workload = [
+                ("party_seat_share", {}),
+                ("party_seat_share", {"year": year, "gender": "F"}),
+                ("state_turnout", {}),
+                ("gender_representation", {}),
+                ("top_vote_share", {"year": year}),
+                ("margin_distribution", {"limit": 100}),
+                ("margin_distribution", {"year": year, "state": state}),
+                ("biggest_seat_change", {}),
+                ("women_participation", {}),
+                ("closest_margins", {}),
+                ("vote_share_trend", {}),
+                ("education_win_rate", {}),
+            ]
+            rows = db.execute(text("SELECT COUNT(*) FROM candidates")).scalar()
+            print(f"Uncached calls over {rows:,} candidates, by engine")
+            for name, kwargs in workload:
+                label = ", ".join(f"{k}={v}" for k, v in kwargs.items())
+                print(f"{name}({label})")
+                for engine, module in engines:
+                    query = getattr(module, name)
+                    if module is not queries and query.__module__ != module.__name__:
+                        continue  # this engine serves it from SQL
+                    call = lambda query=inspect.unwrap(query): query(db, **kwargs)  # noqa: E731
+                    print(f"  {engine:<6} {_percentiles(_time_calls([call], args.repeat * 10))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API queries.")
+    parser.add_argument("--csv", type=Path, default=RAW_DATA, help="Raw Lok Dhaba CSV")
+    parser.add_argument("--db", type=Path, help="Reuse (or build at) this database path")
+    parser.add_argument("--scale", type=int, default=10, help="Repeat the raw rows this many times")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the workload")
+    parser.add_argument("--seed", type=int, default=7)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="LIKE scan vs FTS5 trigram search")
+    search.add_argument("--terms", type=int, default=50, help="Random name fragments to search")
+    search.set_defaults(func=bench_search)
+
+    cache = commands.add_parser("cache", help="Dashboard load with a cold vs warm response cache")
+    cache.set_defaults(func=bench_cache)
+
+    pool = commands.add_parser("pool", help="Query throughput by thread count, default vs serving engine")
+    pool.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    pool.set_defaults(func=bench_pool)
+
+    json_ = commands.add_parser("json", help="Response models vs the orjson fast path, per 10k rows")
+    json_.set_defaults(func=bench_json)
+
+    pages = commands.add_parser("pages", help="First vs deep keyset pages of the paginated queries")
+    pages.add_argument("--page-size", type=int, default=100)
+    pages.set_defaults(func=bench_pages)
+
+    engines = commands.add_parser("engines", help="SQLite queries vs the NumPy and DuckDB engines")
+    engines.set_defaults(func=bench_engines)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+import tracemalloc
+import uuid
+import warnings
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.exc import OperationalError, SAWarning
+from sqlalchemy.types import BigInteger
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 RAW_DATA = BASE_DIR / "All_States_GE.csv"
@@ -91,52 +104,169 @@ BOOL_COLS = {
 }
 
 
+# Declared reader dtypes: low-cardinality text columns are parsed straight into
+# categoricals (string cleaning then runs once per category instead of once per
+# row); Candidate stays object so chunks with no names are not read as float.
+READ_DTYPES: Dict[str, str] = {
+    "State_Name": "category",
+    "Sex": "category",
+    "Party": "category",
+    "Constituency_Name": "category",
+    "Party_Type_TCPD": "category",
+    "MyNeta_education": "category",
+    "Candidate": "object",
+}
+
+BOOL_VALUES = {"true": True, "false": False, "1": True, "0": False}
+
+TURNOUT_KEYS = ["year", "state_name", "constituency_name"]
+
+PARTITION_KEYS = ["year", "state_name"]
+MANIFEST_TABLE = "load_manifest"
+SEARCH_TABLE = "candidate_search"
+METADATA_TABLE = "load_metadata"
+
+# Tables whose rows belong to exactly one (year, state) partition and the
+# per-year tables that must be recomputed when any partition of a year changes.
+PARTITIONED_TABLES = [
+    "candidates",
+    "seat_cube",
+    "state_turnout",
+    "victory_margins",
+    "candidate_lookup",
+]
+YEARLY_TABLES = ["gender_representation", "party_vote_share"]
+
+# String columns stored as integer surrogate keys in the fact tables, mapped to
+# (dimension table, key column).
+DIMENSIONS: Dict[str, Tuple[str, str]] = {
+    "state_name": ("dim_state", "state_key"),
+    "party": ("dim_party", "party_key"),
+    "constituency_name": ("dim_constituency", "constituency_key"),
+    "education": ("dim_education", "education_key"),
+}
+FACT_TABLES = {"candidates", "seat_cube", "victory_margins", "candidate_lookup"}
+
+# Dimensions seat_cube can roll up. Bit i of its grouping_id is set on the rows
+# where SEAT_CUBE_ROLLUPS[i] is summed over (and stored as NULL), as GROUPING() does.
+SEAT_CUBE_KEYS = ["year", "state_name", "party"]
+SEAT_CUBE_ROLLUPS = ["gender", "constituency_type"]
+
+# Column kinds in widening order, as pandas widens a column across concatenated
+# chunks; "null" is a float column with no values in it.
+COLUMN_KINDS = ["null", "bool", "int", "float", "text"]
+
+BULK_BATCH_ROWS = 50_000
+BULK_CACHE_KIB = 262_144
+
+# Group keys of the additive aggregates; partial results computed on separate
+# chunks are merged by summing their value columns over these keys.
+ADDITIVE_AGGREGATES: Dict[str, List[str]] = {
+    "seat_cube": SEAT_CUBE_KEYS + SEAT_CUBE_ROLLUPS + ["grouping_id"],
+    "gender_representation": ["year", "gender"],
+    "party_vote_share": ["year", "party"],
+}
+
+
 def _load_raw_csv(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"CSV not found at {path}")
-    df = pd.read_csv(path, low_memory=False)
+    df = pd.read_csv(path, low_memory=False, dtype=READ_DTYPES)
     return df
 
 
+def _iter_raw_csv(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    if not path.exists():
+        raise FileNotFoundError(f"CSV not found at {path}")
+    yield from pd.read_csv(path, chunksize=chunksize, dtype=READ_DTYPES)
+
+
+def _as_categorical(series: pd.Series) -> pd.Series:
+    return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+
+
+def _map_categories(series: pd.Series, func: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """Apply a string transform to each category rather than to every row.
+
+    Categories that collapse onto the same value are merged and the result keeps
+    its categories sorted, so groupby order matches the equivalent object column.
+    """
+    series = _as_categorical(series)
+    mapped = pd.Index(func(pd.Series(series.cat.categories, dtype=object)), dtype=object)
+    categories = pd.Index(mapped.dropna().unique(), dtype=object).sort_values()
+    recode = np.append(categories.get_indexer(mapped), -1)
+    codes = recode[series.cat.codes.to_numpy()]
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories), index=series.index, name=series.name
+    )
+
+
+def _fill_category(series: pd.Series, value: str) -> pd.Series:
+    series = _as_categorical(series)
+    if value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+        series = series.cat.reorder_categories(series.cat.categories.sort_values())
+    return series.fillna(value)
+
+
+def _map_distinct(series: pd.Series, func: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """Apply ``func`` to the distinct non-null values of ``series`` and broadcast back."""
+    codes, uniques = pd.factorize(series)
+    mapped = func(pd.Series(uniques)).to_numpy(dtype=object)
+    return pd.Series(np.append(mapped, np.nan)[codes], index=series.index, name=series.name)
+
+
+def _downcast(series: pd.Series) -> pd.Series:
+    # Only columns that are already integral are narrowed; float columns keep
+    # float64 so NULL handling and stored values are unchanged.
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast="integer")
+    return series
+
+
 def _clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     df = df.rename(columns=COLUMN_MAP)
 
     # Add derived columns
     df["is_winner"] = df["position"] == 1
-    df["party_class"] = df["party_type"].fillna("Unknown")
-    df["gender"] = df["gender"].str.upper().replace({"FEMALE": "F", "MALE": "M"})
-    df["gender"] = df["gender"].fillna("NA")
-    df["education"] = df["education"].fillna("Not Available")
+    df["party_class"] = _fill_category(df["party_type"], "Unknown")
+    df["gender"] = _map_categories(
+        df["gender"], lambda values: values.str.upper().replace({"FEMALE": "F", "MALE": "M"})
+    )
+    df["gender"] = _fill_category(df["gender"], "NA")
+    df["education"] = _fill_category(df["education"], "Not Available")
     df["candidate_name"] = df["candidate_name"].str.title().str.strip()
-    df["state_name"] = df["state_name"].str.replace("_", " ").str.title()
-    df["constituency_name"] = df["constituency_name"].str.title()
+    df["state_name"] = _map_categories(
+        df["state_name"], lambda values: values.str.replace("_", " ").str.title()
+    )
+    df["constituency_name"] = _map_categories(
+        df["constituency_name"], lambda values: values.str.title()
+    )
 
     for col in NUMERIC_COLS:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+            df[col] = _downcast(pd.to_numeric(df[col], errors="coerce"))
 
     for col in BOOL_COLS:
         if col in df.columns:
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.strip()
-                .str.lower()
-                .map({"true": True, "false": False, "1": True, "0": False})
-            )
+            df[col] = _map_distinct(
+                df[col], lambda values: values.astype(str).str.strip().str.lower().map(BOOL_VALUES)
+            ).astype("boolean")
 
     df["deposit_lost"] = (
-        df["deposit_lost"].astype(str).str.lower().map({"yes": True, "no": False})
-    )
-    df["deposit_lost"] = df["deposit_lost"].where(df["deposit_lost"].notna(), False).astype(
-        bool
+        _map_distinct(
+            df["deposit_lost"],
+            lambda values: values.astype(str).str.lower().map({"yes": True, "no": False}),
+        )
+        .fillna(False)
+        .astype(bool)
     )
     df["turnout_pct"] = df["turnout_pct"].fillna(0)
     df["vote_share_pct"] = df["vote_share_pct"].fillna(0)
     df["margin_pct"] = df["margin_pct"].fillna(0)
 
     df = df.dropna(subset=["year", "state_name", "constituency_name"])
-    df["party"] = df["party"].fillna("IND")
+    df["party"] = _fill_category(df["party"], "IND")
     df = df[(df["year"] >= 1991) & (df["year"] <= 2019)]
 
     return df
@@ -148,52 +278,64 @@ def _create_engine(db_path: Path):
     return create_engine(uri, future=True)
 
 
-def _write_tables(df: pd.DataFrame, engine) -> None:
-    df.to_sql("candidates", engine, if_exists="replace", index=False)
-
-    # Aggregations
+def _seat_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Seats won per (year, state, party) under every grouping set of SEAT_CUBE_ROLLUPS."""
     winners = df[df["is_winner"]]
-    party_year = (
-        winners.groupby(["year", "party", "state_name"], as_index=False)
-        .agg(seats=("is_winner", "sum"))
-    )
-    party_year.to_sql("party_seat_summary", engine, if_exists="replace", index=False)
-
-    turnout = (
-        df.drop_duplicates(subset=["year", "state_name", "constituency_name"])
-        .groupby(["year", "state_name"], as_index=False)
-        .agg(
-            turnout_pct=("turnout_pct", "mean"),
-            electors=("electors", "sum"),
-            valid_votes=("valid_votes", "sum"),
-        )
-    )
-    turnout.to_sql("state_turnout", engine, if_exists="replace", index=False)
+    frames = []
+    for grouping in range(1 << len(SEAT_CUBE_ROLLUPS)):
+        rolled = [col for i, col in enumerate(SEAT_CUBE_ROLLUPS) if grouping & (1 << i)]
+        kept = [col for col in SEAT_CUBE_ROLLUPS if col not in rolled]
+        frame = winners.groupby(
+            SEAT_CUBE_KEYS + kept, as_index=False, observed=True, dropna=False
+        ).agg(seats=("is_winner", "sum"))
+        for col in SEAT_CUBE_ROLLUPS:
+            # Object columns throughout, so the NULLs of rolled-up rows concatenate cleanly.
+            frame[col] = None if col in rolled else frame[col].astype(object)
+        frame["grouping_id"] = grouping
+        frames.append(frame)
+    columns = SEAT_CUBE_KEYS + SEAT_CUBE_ROLLUPS + ["grouping_id", "seats"]
+    return pd.concat([frame.loc[:, columns] for frame in frames], ignore_index=True)
 
-    gender = (
-        df.groupby(["year", "gender"], as_index=False)
-        .agg(
-            total_candidates=("candidate_name", "count"),
-            total_winners=("is_winner", "sum"),
-        )
+
+def _turnout_rows(df: pd.DataFrame) -> pd.DataFrame:
+    return df.drop_duplicates(subset=TURNOUT_KEYS).loc[
+        :, TURNOUT_KEYS + ["turnout_pct", "electors", "valid_votes"]
+    ]
+
+
+def _summarise_turnout(rows: pd.DataFrame) -> pd.DataFrame:
+    return rows.groupby(["year", "state_name"], as_index=False, observed=True).agg(
+        turnout_pct=("turnout_pct", "mean"),
+        electors=("electors", "sum"),
+        valid_votes=("valid_votes", "sum"),
     )
-    gender.to_sql("gender_representation", engine, if_exists="replace", index=False)
 
-    vote_share = (
-        df.groupby(["year", "party"], as_index=False)
-        .agg(
-            total_votes=("votes", "sum"),
-        )
+
+def _state_turnout(df: pd.DataFrame) -> pd.DataFrame:
+    return _summarise_turnout(_turnout_rows(df))
+
+
+def _gender_representation(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(["year", "gender"], as_index=False, observed=True).agg(
+        total_candidates=("candidate_name", "count"),
+        total_winners=("is_winner", "sum"),
     )
-    vote_share.to_sql("party_vote_share", engine, if_exists="replace", index=False)
 
-    margin = (
-        df[df["is_winner"]]
-        .loc[:, ["year", "state_name", "constituency_name", "party", "margin"]]
+
+def _party_vote_share(df: pd.DataFrame) -> pd.DataFrame:
+    return df.groupby(["year", "party"], as_index=False, observed=True).agg(
+        total_votes=("votes", "sum"),
     )
-    margin.to_sql("victory_margins", engine, if_exists="replace", index=False)
 
-    search = df.loc[
+
+def _victory_margins(df: pd.DataFrame) -> pd.DataFrame:
+    return df[df["is_winner"]].loc[
+        :, ["year", "state_name", "constituency_name", "party", "margin"]
+    ]
+
+
+def _candidate_lookup(df: pd.DataFrame) -> pd.DataFrame:
+    return df.loc[
         :,
         [
             "year",
@@ -207,37 +349,944 @@ def _write_tables(df: pd.DataFrame, engine) -> None:
             "margin",
         ],
     ]
-    search.to_sql("candidate_lookup", engine, if_exists="replace", index=False)
 
-    # Views and indices
+
+AGGREGATE_BUILDERS: Dict[str, Callable[[pd.DataFrame], pd.DataFrame]] = {
+    "seat_cube": _seat_cube,
+    "state_turnout": _state_turnout,
+    "gender_representation": _gender_representation,
+    "party_vote_share": _party_vote_share,
+    "victory_margins": _victory_margins,
+    "candidate_lookup": _candidate_lookup,
+}
+
+def _partial_aggregates(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    return {
+        "seat_cube": _seat_cube(df),
+        "state_turnout": _turnout_rows(df),
+        "gender_representation": _gender_representation(df),
+        "party_vote_share": _party_vote_share(df),
+    }
+
+
+def _merge_aggregates(
+    totals: Dict[str, pd.DataFrame], partial: Dict[str, pd.DataFrame]
+) -> Dict[str, pd.DataFrame]:
+    if not totals:
+        return partial
+    merged = {}
+    for name, keys in ADDITIVE_AGGREGATES.items():
+        combined = pd.concat([totals[name], partial[name]], ignore_index=True)
+        merged[name] = combined.groupby(keys, as_index=False, observed=True, dropna=False).sum()
+    # Turnout is a mean over constituencies, so keep the first row seen for
+    # each constituency (as the full load does) and summarise at the end.
+    merged["state_turnout"] = pd.concat(
+        [totals["state_turnout"], partial["state_turnout"]], ignore_index=True
+    ).drop_duplicates(subset=TURNOUT_KEYS)
+    return merged
+
+
+def _hashable_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast ``df`` to fixed dtypes, so a row hashes the same whatever else the frame holds.
+
+    NUMERIC_COLS become float64, flags True/False/None and the rest objects with
+    None for missing, so a text column read as float in a chunk where it is blank
+    matches the other chunks.
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in NUMERIC_COLS:
+            columns[col] = pd.to_numeric(series, errors="coerce").astype(np.float64)
+        elif pd.api.types.is_bool_dtype(series.dtype) and col not in BOOL_COLS:
+            columns[col] = series.astype(bool)
+        else:
+            if pd.api.types.is_numeric_dtype(series.dtype) and col not in BOOL_COLS:
+                series = series.astype(np.float64)
+            values = series.astype(object)
+            columns[col] = values.where(values.notna(), None)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _update_partition_hashes(
+    hashers: Dict[Tuple[int, str], Any], df: pd.DataFrame
+) -> Dict[Tuple[int, str], Any]:
+    row_hashes = pd.util.hash_pandas_object(_hashable_frame(df), index=False).to_numpy()
+    partitions = df.groupby(PARTITION_KEYS, sort=False, observed=True).indices
+    for (year, state), positions in partitions.items():
+        key = (int(year), state)
+        if key not in hashers:
+            hashers[key] = [hashlib.sha256(), 0]
+        hashers[key][0].update(row_hashes[positions].tobytes())
+        hashers[key][1] += len(positions)
+    return hashers
+
+
+def _manifest_frame(hashers: Dict[Tuple[int, str], Any]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "year": year,
+                "state_name": state,
+                "partition_hash": hasher.hexdigest(),
+                "row_count": rows,
+            }
+            for (year, state), (hasher, rows) in sorted(hashers.items())
+        ],
+        columns=["year", "state_name", "partition_hash", "row_count"],
+    )
+
+
+def _read_manifest(engine) -> Dict[Tuple[int, str], str]:
+    with engine.connect() as conn:
+        tables = {
+            row[0]
+            for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))
+        }
+        # A database from an older loader lacks some table an incremental load
+        # rewrites, so it gets a full load instead.
+        required = {MANIFEST_TABLE, *PARTITIONED_TABLES, *YEARLY_TABLES}
+        if not required | {table for table, _ in DIMENSIONS.values()} <= tables:
+            return {}
+        rows = conn.execute(
+            text(f"SELECT year, state_name, partition_hash FROM {MANIFEST_TABLE}")
+        )
+        return {(int(year), state): digest for year, state, digest in rows}
+
+
+# One entry per access path in backend/app/queries.py; trailing columns make the
+# index covering. tests/test_query_plans.py checks every query uses one.
+PARTY_CATEGORY_SQL = (
+    "CASE WHEN party_type LIKE '%National%' THEN 'National' "
+    "WHEN party_type LIKE '%State%' THEN 'Regional' ELSE 'Other' END"
+)
+QUERY_INDEXES = {
+    "idx_candidates_partition": "candidates(year, state_key)",
+    "idx_candidates_party": "candidates(party_key)",
+    "idx_candidates_gender": "candidates(gender)",
+    "idx_candidates_winners": (
+        "candidates(year, party_key, state_key, gender, is_winner) WHERE is_winner = 1"
+    ),
+    "idx_candidates_education": "candidates(education_key, is_winner)",
+    "idx_seat_cube_year": "seat_cube(grouping_id, gender, year, seats DESC, party_key, state_key)",
+    "idx_seat_cube_state": "seat_cube(grouping_id, gender, state_key, year, seats DESC, party_key)",
+    "idx_party_year_delta_year": (
+        "party_year_delta(state_key, year, seat_change, vote_share_change, party_key)"
+    ),
+    "idx_party_year_delta_swing": (
+        "party_year_delta(state_key, seat_change, vote_share_change, year, party_key)"
+    ),
+    "idx_party_year_delta_abs": "party_year_delta(state_key, ABS(seat_change))",
+    "idx_candidates_category": f"candidates(year, ({PARTY_CATEGORY_SQL}), votes, party_type)",
+    "idx_state_turnout_year": (
+        "state_turnout(year, turnout_pct DESC, state_name, electors, valid_votes)"
+    ),
+    "idx_gender_representation_year": (
+        "gender_representation(year, gender, total_candidates, total_winners)"
+    ),
+    "idx_gender_representation_gender": "gender_representation(gender)",
+    "idx_party_vote_share_year": "party_vote_share(year, total_votes DESC, party)",
+    "idx_victory_margins_margin": (
+        "victory_margins(margin, year, state_key, constituency_key, party_key)"
+    ),
+    "idx_victory_margins_year": (
+        "victory_margins(year, margin, state_key, constituency_key, party_key)"
+    ),
+    "idx_victory_margins_state": (
+        "victory_margins(state_key, margin, year, constituency_key, party_key)"
+    ),
+    "idx_victory_margins_year_state": (
+        "victory_margins(year, state_key, margin, constituency_key, party_key)"
+    ),
+    "idx_victory_margins_constituency": (
+        "victory_margins(constituency_key, margin, year, state_key, party_key)"
+    ),
+    "idx_candidate_lookup_year": "candidate_lookup(year DESC)",
+}
+
+
+def _partition_filter(table: str) -> str:
+    if table in FACT_TABLES:
+        return (
+            "year = :year AND state_key = "
+            "(SELECT state_key FROM dim_state WHERE state_name = :state_name)"
+        )
+    return "year = :year AND state_name = :state_name"
+
+
+# Seats and vote share of each party between consecutive elections, per state and
+# all-India (state_key NULL; 0 while building, as dimension keys start at 1).
+# Parties that contested either election of a pair get a row, so wipe-outs count.
+PARTY_YEAR_DELTA_DDL = """
+    CREATE TABLE party_year_delta (
+        year INTEGER, prev_year INTEGER, state_key INTEGER, party_key INTEGER,
+        seats INTEGER, prev_seats INTEGER, seat_change INTEGER,
+        vote_share_pct REAL, prev_vote_share_pct REAL, vote_share_change REAL
+    )
+"""
+PARTY_YEAR_DELTA_SQL = """
+    INSERT INTO party_year_delta
+    WITH state_votes AS (
+        SELECT year, state_key, party_key, SUM(votes) AS votes
+        FROM candidates
+        WHERE {scope}
+        GROUP BY year, state_key, party_key
+    ),
+    votes AS (
+        SELECT year, state_key, party_key, votes FROM state_votes
+        UNION ALL
+        SELECT year, 0, party_key, SUM(votes) FROM state_votes GROUP BY year, party_key
+    ),
+    seats AS (
+        SELECT year, state_key, party_key, seats FROM seat_cube WHERE grouping_id = 3 AND {scope}
+        UNION ALL
+        SELECT year, 0, party_key, SUM(seats) FROM seat_cube WHERE grouping_id = 3 AND {scope}
+        GROUP BY year, party_key
+    ),
+    shares AS MATERIALIZED (
+        SELECT v.year, v.state_key, v.party_key, COALESCE(s.seats, 0) AS seats,
+               COALESCE(
+                   v.votes * 100.0 / NULLIF(SUM(v.votes) OVER (PARTITION BY v.year, v.state_key), 0), 0
+               ) AS vote_share_pct
+        FROM votes AS v
+        LEFT JOIN seats AS s
+            ON s.year = v.year AND s.state_key = v.state_key AND s.party_key = v.party_key
+    ),
+    pairs AS (
+        SELECT year, state_key, LAG(year) OVER (PARTITION BY state_key ORDER BY year) AS prev_year
+        FROM (SELECT DISTINCT year, state_key FROM shares)
+    ),
+    pair_parties AS (
+        SELECT DISTINCT p.year, p.prev_year, p.state_key, s.party_key
+        FROM pairs AS p
+        JOIN shares AS s ON s.state_key = p.state_key AND s.year IN (p.year, p.prev_year)
+        WHERE p.prev_year IS NOT NULL
+    )
+    SELECT k.year, k.prev_year, NULLIF(k.state_key, 0) AS state_key, k.party_key,
+           COALESCE(c.seats, 0) AS seats,
+           COALESCE(b.seats, 0) AS prev_seats,
+           COALESCE(c.seats, 0) - COALESCE(b.seats, 0) AS seat_change,
+           COALESCE(c.vote_share_pct, 0.0) AS vote_share_pct,
+           COALESCE(b.vote_share_pct, 0.0) AS prev_vote_share_pct,
+           COALESCE(c.vote_share_pct, 0.0) - COALESCE(b.vote_share_pct, 0.0) AS vote_share_change
+    FROM pair_parties AS k
+    LEFT JOIN shares AS c
+        ON c.year = k.year AND c.state_key = k.state_key AND c.party_key = k.party_key
+    LEFT JOIN shares AS b
+        ON b.year = k.prev_year AND b.state_key = k.state_key AND b.party_key = k.party_key
+    WHERE {keep}
+"""
+
+
+def _create_party_year_delta(conn) -> None:
+    # Older databases have party_year_delta as a view over candidates.
+    kind = conn.execute(
+        text("SELECT type FROM sqlite_master WHERE name = 'party_year_delta'")
+    ).scalar()
+    if kind:
+        conn.execute(text(f"DROP {kind.upper()} party_year_delta"))
+    conn.execute(text(PARTY_YEAR_DELTA_DDL))
+    conn.execute(text(PARTY_YEAR_DELTA_SQL.format(scope="1", keep="1")))
+
+
+def _update_party_year_delta(conn, state_keys: Set[int], years: Set[int], all_years: List[int]) -> None:
+    """Recompute the delta rows an incremental load can change.
+
+    Those are every row of the rewritten states, and the all-India rows of pairs
+    that touch a rewritten year. The all-India sums need every state of those
+    years and of their neighbouring elections; the set of election years must be
+    unchanged, or the pairs themselves move and the table is rebuilt instead.
+    """
+    neighbours = set(years)
+    for position, year in enumerate(all_years):
+        if year in years:
+            neighbours.update(all_years[max(position - 1, 0) : position + 2])
+    states = ", ".join(str(int(key)) for key in sorted(state_keys)) or "NULL"
+    changed = ", ".join(str(int(year)) for year in sorted(years))
+    read = ", ".join(str(int(year)) for year in sorted(neighbours))
+    conn.execute(
+        text(
+            f"DELETE FROM party_year_delta WHERE state_key IN ({states}) "
+            f"OR (state_key IS NULL AND (year IN ({changed}) OR prev_year IN ({changed})))"
+        )
+    )
+    conn.execute(
+        text(
+            PARTY_YEAR_DELTA_SQL.format(
+                scope=f"(year IN ({read}) OR state_key IN ({states}))",
+                keep=(
+                    f"k.state_key IN ({states}) OR (k.state_key = 0 "
+                    f"AND (k.year IN ({changed}) OR k.prev_year IN ({changed})))"
+                ),
+            )
+        )
+    )
+
+
+def _create_indexes_and_views(engine, rebuild: bool = True) -> None:
+    """Create missing indexes; ``rebuild`` also rebuilds party_year_delta and statistics.
+
+    Incremental loads keep party_year_delta up to date themselves and only refresh
+    the statistics SQLite considers stale.
+    """
     with engine.begin() as conn:
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_candidates_year ON candidates(year)"))
+        if rebuild:
+            _create_party_year_delta(conn)
+        for column, (table, key) in DIMENSIONS.items():
+            conn.execute(
+                text(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_key ON {table}({key})")
+            )
+            conn.execute(
+                text(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_name ON {table}({column})")
+            )
+        for name, definition in QUERY_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+        # Superseded by seat_cube, which adds the gender and constituency_type rollups.
+        conn.execute(text("DROP TABLE IF EXISTS party_seat_summary"))
+        conn.execute(text("ANALYZE" if rebuild else "PRAGMA optimize"))
+
+
+_SEARCH_ROWS = (
+    "SELECT l.rowid, l.candidate_name, c.constituency_name FROM candidate_lookup AS l "
+    "JOIN dim_constituency AS c ON c.constituency_key = l.constituency_key"
+)
+
+
+def _create_search_index(engine) -> None:
+    """Rebuild the trigram FTS5 index that backs substring search.
+
+    The table is contentless and keyed by ``candidate_lookup.rowid``, so it only
+    stores the index; incremental loads delete and re-add the rows they rewrite.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+        conn.execute(
+            text(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                "candidate_name, constituency_name, content='', tokenize='trigram')"
+            )
+        )
         conn.execute(
-            text("CREATE INDEX IF NOT EXISTS idx_candidates_state ON candidates(state_name)")
+            text(f"INSERT INTO {SEARCH_TABLE}(rowid, candidate_name, constituency_name) {_SEARCH_ROWS}")
         )
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_candidates_party ON candidates(party)"))
+        conn.execute(text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"))
+
+
+def _has_table(conn, name: str) -> bool:
+    return bool(
+        conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name}).first()
+    )
+
+
+def _read_generation(engine) -> Optional[str]:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                text(f"SELECT value FROM {METADATA_TABLE} WHERE key = 'generation'")
+            ).scalar()
+    except OperationalError:
+        return None
+
+
+def _filters_snapshot(conn) -> Dict[str, Any]:
+    """Filter catalogue for ``/filters``: global option lists plus, per (year, state),
+    the positions of the constituencies and parties that appear there."""
+
+    def column(sql: str) -> List[Any]:
+        return [row[0] for row in conn.execute(text(sql)) if row[0] is not None]
+
+    snapshot: Dict[str, Any] = {
+        "years": column("SELECT DISTINCT year FROM gender_representation ORDER BY year"),
+        "genders": column("SELECT DISTINCT gender FROM gender_representation ORDER BY gender"),
+    }
+    lists = {"states": "state_name", "parties": "party", "constituencies": "constituency_name"}
+    positions = {}
+    for name, column_name in lists.items():
+        table, key = DIMENSIONS[column_name]
+        rows = conn.execute(
+            text(f"SELECT {key}, {column_name} FROM {table} ORDER BY {column_name}")
+        ).all()
+        snapshot[name] = [label for _, label in rows]
+        positions[name] = {code: position for position, (code, _) in enumerate(rows)}
+
+    partitions: Dict[Tuple[int, int], Dict[str, Set[int]]] = {}
+    for name in ["constituencies", "parties"]:
+        key = DIMENSIONS[lists[name]][1]
+        rows = conn.execute(text(f"SELECT DISTINCT year, state_key, {key} FROM candidates"))
+        for year, state_key, code in rows:
+            entry = partitions.setdefault((year, state_key), {"constituencies": set(), "parties": set()})
+            entry[name].add(positions[name][code])
+    snapshot["partitions"] = [
+        {
+            "year": year,
+            "state": positions["states"][state_key],
+            "constituencies": sorted(entry["constituencies"]),
+            "parties": sorted(entry["parties"]),
+        }
+        for (year, state_key), entry in sorted(partitions.items())
+    ]
+    return snapshot
+
+
+def _write_load_metadata(engine) -> str:
+    """Record the filter snapshot and a fresh generation stamp in one transaction.
+
+    The API drops its response cache when the generation changes.
+    """
+    generation = uuid.uuid4().hex
+    with engine.begin() as conn:
         conn.execute(
             text(
-                "CREATE VIEW IF NOT EXISTS party_year_delta AS "
-                "WITH seat_counts AS ("
-                " SELECT year, party, COUNT(*) AS seats "
-                " FROM candidates WHERE is_winner = 1 GROUP BY year, party"
-                "), "
-                "ranked AS ("
-                " SELECT *, LAG(seats) OVER (PARTITION BY party ORDER BY year) AS prev_seats "
-                " FROM seat_counts"
-                ") "
-                "SELECT year, party, seats, COALESCE(seats - prev_seats, 0) AS seat_change "
-                "FROM ranked"
+                f"CREATE TABLE IF NOT EXISTS {METADATA_TABLE} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
             )
         )
+        conn.execute(
+            text(f"INSERT OR REPLACE INTO {METADATA_TABLE}(key, value) VALUES (:key, :value)"),
+            [
+                {"key": "filters", "value": json.dumps(_filters_snapshot(conn), separators=(",", ":"))},
+                {"key": "generation", "value": generation},
+                {"key": "loaded_at", "value": datetime.now(timezone.utc).isoformat()},
+            ],
+        )
+    return generation
+
+
+def parquet_path(db_path: Path) -> Path:
+    """Where the Parquet copy of ``db_path`` lives (the API's default ELECTIONS_PARQUET_DIR)."""
+    return db_path.with_suffix(".parquet")
+
+
+def write_parquet(
+    engine, directory: Path, generation: str, years: Optional[Set[int]] = None
+) -> Optional[Path]:
+    """Write ``candidates`` as Parquet partitioned by year, for the DuckDB engine.
+
+    Dimension keys are written as the names they encode, so queries need no joins,
+    and ``year`` lives only in the ``year=...`` directory names. The copy is built
+    beside ``directory`` and swapped in whole, stamped with the load generation so
+    the API can tell when it is stale. With ``years``, only those years are
+    rewritten and the others are hard-linked from the current copy.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed; skipping the Parquet copy")
+        return None
+    staging = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    with engine.connect() as conn:
+        columns = []
+        for _, name, *_ in conn.execute(text("PRAGMA table_info(candidates)")):
+            if name == "year":
+                continue
+            dimension = next((column for column, (_, key) in DIMENSIONS.items() if key == name), None)
+            if dimension:
+                table, key = DIMENSIONS[dimension]
+                decoded = f"SELECT d.{dimension} FROM {table} AS d WHERE d.{key} = c.{key}"
+                columns.append(f"({decoded}) AS {dimension}")
+            else:
+                columns.append(f"c.{name}")
+        sql = text(f"SELECT {', '.join(columns)} FROM candidates AS c WHERE c.year = :year")
+        present = conn.execute(text("SELECT DISTINCT year FROM candidates ORDER BY year")).scalars().all()
+        for year in present:
+            partition = staging / "candidates" / f"year={year}"
+            if years is not None and year not in years:
+                current = directory / "candidates" / f"year={year}"
+                shutil.copytree(current, partition, copy_function=os.link)
+                continue
+            frame = pd.read_sql(sql, conn, params={"year": year}, dtype_backend="numpy_nullable")
+            partition.mkdir(parents=True)
+            pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), partition / "part-0.parquet")
+    (staging / "generation").write_text(generation)
+    previous = directory.with_name(directory.name + ".old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if directory.exists():
+        directory.rename(previous)
+    staging.rename(directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return directory
+
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(series.dtype):
+        # A column read back as all-NaN floats says nothing about its type.
+        return "float" if series.notna().any() else "null"
+    return "text"
+
+
+def _widen_kind(current: str, kind: str) -> str:
+    """The kind pandas gives a column whose chunks have kinds ``current`` and ``kind``."""
+    if {current, kind} == {"null", "int"}:
+        return "float"
+    return max(current, kind, key=COLUMN_KINDS.index)
+
+
+def _redeclare_columns(execute: Callable[[str], Any], name: str, types: Dict[str, str]) -> None:
+    # SQLite cannot change a column's declared type, so the table is copied.
+    columns = [row[1:3] for row in execute(f'PRAGMA table_info("{name}")').fetchall()]
+    ddl = ", ".join(f'"{col}" {types.get(col, declared)}' for col, declared in columns)
+    staging = f"{name}__redeclared"
+    execute(f'CREATE TABLE "{staging}" ({ddl})')
+    execute(f'INSERT INTO "{staging}" SELECT * FROM "{name}"')
+    execute(f'DROP TABLE "{name}"')
+    execute(f'ALTER TABLE "{staging}" RENAME TO "{name}"')
+
+
+def _sqlite_type(series: pd.Series) -> str:
+    kind = pd.api.types.infer_dtype(series, skipna=True)
+    if kind == "boolean":
+        return "BOOLEAN"
+    if kind == "integer":
+        return "INTEGER"
+    if kind in {"floating", "mixed-integer-float", "decimal"}:
+        return "REAL"
+    return "TEXT"
+
+
+class MemoryProfiler:
+    """Records retained and peak traced (tracemalloc) memory per load stage."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages: List[Tuple[str, int, int]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append((name, current - before, peak))
+
+    def report(self) -> str:
+        mib = 1024 * 1024
+        lines = [
+            f"{name:<16} {retained / mib:>+10.1f} MiB retained {peak / mib:>10.1f} MiB peak"
+            for name, retained, peak in self.stages
+        ]
+        overall = max((peak for _, _, peak in self.stages), default=0)
+        lines.append(f"{'overall peak':<16} {overall / mib:>10.1f} MiB")
+        return "\n".join(lines)
+
+
+def _sql_dtypes(df: pd.DataFrame) -> Dict[str, Any]:
+    # Downcast integer columns would otherwise be declared SMALLINT/INTEGER;
+    # keep the BIGINT declarations the int64 columns always produced.
+    return {col: BigInteger for col in df.columns if pd.api.types.is_integer_dtype(df[col].dtype)}
+
+
+def _bind_values(series: pd.Series) -> np.ndarray:
+    values = series.to_numpy(dtype=object)
+    values[series.isna().to_numpy()] = None
+    return values
+
+
+class DimensionEncoder:
+    """Assigns stable integer surrogate keys to the DIMENSIONS string columns.
+
+    Keys are only ever appended, so an encoder seeded from an existing database
+    keeps every key already referenced by its fact tables.
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, Dict[Any, int]] = {column: {} for column in DIMENSIONS}
+        self.last_key: Dict[str, int] = {column: 0 for column in DIMENSIONS}
+
+    @classmethod
+    def from_database(cls, engine) -> "DimensionEncoder":
+        encoder = cls()
+        with engine.connect() as conn:
+            tables = {
+                row[0]
+                for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))
+            }
+            for column, (table, key) in DIMENSIONS.items():
+                if table not in tables:
+                    continue
+                for value_key, value in conn.execute(text(f"SELECT {key}, {column} FROM {table}")):
+                    encoder.keys[column][value] = value_key
+                    encoder.last_key[column] = max(encoder.last_key[column], value_key)
+        return encoder
+
+    def _encode_column(self, column: str, series: pd.Series):
+        codes, uniques = pd.factorize(series, sort=True)
+        mapping = self.keys[column]
+        for value in uniques:
+            if value not in mapping:
+                self.last_key[column] += 1
+                mapping[value] = self.last_key[column]
+        lookup = np.array([mapping[value] for value in uniques] + [0], dtype=np.int64)
+        keys = lookup[codes]
+        if (codes == -1).any():
+            keys = pd.array(keys, dtype="Int64")
+            keys[codes == -1] = pd.NA
+        return keys
+
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        columns = {}
+        for column in df.columns:
+            if column in DIMENSIONS:
+                columns[DIMENSIONS[column][1]] = self._encode_column(column, df[column])
+            else:
+                columns[column] = df[column]
+        return pd.DataFrame(columns, index=df.index)
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        for column, (table, key) in DIMENSIONS.items():
+            mapping = sorted(self.keys[column].items(), key=lambda item: item[1])
+            frames[table] = pd.DataFrame(mapping, columns=[column, key]).loc[:, [key, column]]
+        return frames
+
+
+class TableWriter:
+    """Writes frames with DataFrame.to_sql and records per-table throughput.
+
+    Fact tables are dictionary-encoded through ``encoder`` on the way out.
+    """
+
+    # Declared type of each column kind, as DataFrame.to_sql declares it.
+    COLUMN_TYPES = {
+        "null": "FLOAT",
+        "bool": "BOOLEAN",
+        "int": "BIGINT",
+        "float": "FLOAT",
+        "text": "TEXT",
+    }
+
+    def __init__(self, engine, encoder: Optional[DimensionEncoder] = None):
+        self.engine = engine
+        self.encoder = encoder if encoder is not None else DimensionEncoder()
+        self.stats: Dict[str, Tuple[int, float]] = {}
+        # Column kinds of each table this writer created: as first written, and
+        # widened over every chunk appended since.
+        self.declared: Dict[str, Dict[str, str]] = {}
+        self.kinds: Dict[str, Dict[str, str]] = {}
+
+    def __enter__(self) -> "TableWriter":
+        return self
 
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
 
-def load_database(csv_path: Path = RAW_DATA, db_path: Path = DB_PATH) -> Path:
-    df_raw = _load_raw_csv(csv_path)
-    df_clean = _clean_dataframe(df_raw)
+    def __call__(self, name: str, df: pd.DataFrame, if_exists: str = "replace") -> None:
+        start = time.perf_counter()
+        if name in FACT_TABLES:
+            df = self.encoder.encode(df)
+        self._track_kinds(name, df, if_exists)
+        self._write(name, df, if_exists)
+        rows, seconds = self.stats.get(name, (0, 0.0))
+        self.stats[name] = (rows + len(df), seconds + time.perf_counter() - start)
+
+    def _write(self, name: str, df: pd.DataFrame, if_exists: str) -> None:
+        with warnings.catch_warnings():
+            # Replacing reflects the old table, whose expression index SQLAlchemy skips.
+            warnings.filterwarnings("ignore", "Skipped unsupported reflection", SAWarning)
+            df.to_sql(name, self.engine, if_exists=if_exists, index=False, dtype=_sql_dtypes(df))
+
+    def _track_kinds(self, name: str, df: pd.DataFrame, if_exists: str) -> None:
+        if if_exists == "replace":
+            self.declared[name] = {col: _column_kind(df[col]) for col in df.columns}
+            self.kinds[name] = dict(self.declared[name])
+        elif name in self.kinds:
+            kinds = self.kinds[name]
+            for col in df.columns:
+                kinds[col] = _widen_kind(kinds[col], _column_kind(df[col]))
+
+    def redeclare_widened(self) -> None:
+        """Redeclare the columns later chunks widened, as a single write would have typed them.
+
+        The first chunk fixes a table's declared types: a text column that is
+        empty in it is declared as a float column.
+        """
+        for name, kinds in self.kinds.items():
+            declared = self.declared[name]
+            types = {
+                col: self.COLUMN_TYPES[kind]
+                for col, kind in kinds.items()
+                if self.COLUMN_TYPES[kind] != self.COLUMN_TYPES[declared[col]]
+            }
+            if types:
+                self._redeclare(name, types)
+
+    def _redeclare(self, name: str, types: Dict[str, str]) -> None:
+        with self.engine.begin() as conn:
+            _redeclare_columns(conn.exec_driver_sql, name, types)
+
+    def write_dimensions(self) -> None:
+        for table, frame in self.encoder.frames().items():
+            self(table, frame)
+
+    def report(self) -> str:
+        lines = []
+        for name, (rows, seconds) in self.stats.items():
+            rate = rows / seconds if seconds else float("inf")
+            lines.append(f"{name:<24} {rows:>10,} rows {seconds:>8.2f}s {rate:>12,.0f} rows/s")
+        return "\n".join(lines)
+
+
+class BulkWriter(TableWriter):
+    """Writes frames through one raw sqlite3 transaction with typed DDL.
+
+    Journaling and syncing are switched off for the duration of the build, so a
+    crash mid-load leaves a database that must be rebuilt from scratch.
+    """
+
+    COLUMN_TYPES = {
+        "null": "REAL",
+        "bool": "BOOLEAN",
+        "int": "INTEGER",
+        "float": "REAL",
+        "text": "TEXT",
+    }
+
+    def __init__(
+        self,
+        db_path: Path,
+        encoder: Optional[DimensionEncoder] = None,
+        batch_size: int = BULK_BATCH_ROWS,
+    ):
+        super().__init__(engine=None, encoder=encoder)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "BulkWriter":
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(f"PRAGMA cache_size=-{BULK_CACHE_KIB}")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("BEGIN")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        self.conn.close()
+        self.conn = None
+
+    def _redeclare(self, name: str, types: Dict[str, str]) -> None:
+        _redeclare_columns(self.conn.execute, name, types)
+
+    def _write(self, name: str, df: pd.DataFrame, if_exists: str) -> None:
+        columns = ", ".join(f'"{col}"' for col in df.columns)
+        if if_exists == "replace":
+            ddl = ", ".join(f'"{col}" {_sqlite_type(df[col])}' for col in df.columns)
+            self.conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+            self.conn.execute(f'CREATE TABLE "{name}" ({ddl})')
+        insert = (
+            f'INSERT INTO "{name}" ({columns}) '
+            f"VALUES ({', '.join('?' for _ in df.columns)})"
+        )
+        for start in range(0, len(df), self.batch_size):
+            batch = df.iloc[start : start + self.batch_size]
+            self.conn.executemany(insert, zip(*(_bind_values(batch[col]) for col in batch)))
+
+
+def _write_tables(df: pd.DataFrame, write: TableWriter) -> None:
+    write("candidates", df)
+
+    # Aggregations
+    for name, build in AGGREGATE_BUILDERS.items():
+        write(name, build(df))
+    write(MANIFEST_TABLE, _manifest_frame(_update_partition_hashes({}, df)))
+    write.write_dimensions()
+
+
+def _write_tables_chunked(chunks: Iterable[pd.DataFrame], write: TableWriter) -> None:
+    totals: Dict[str, pd.DataFrame] = {}
+    hashers: Dict[Tuple[int, str], Any] = {}
+    if_exists = "replace"
+    for raw in chunks:
+        df = _clean_dataframe(raw)
+        if df.empty:
+            # An empty first chunk would create the tables with untyped columns.
+            continue
+        write("candidates", df, if_exists)
+        write("victory_margins", _victory_margins(df), if_exists)
+        write("candidate_lookup", _candidate_lookup(df), if_exists)
+        totals = _merge_aggregates(totals, _partial_aggregates(df))
+        _update_partition_hashes(hashers, df)
+        if_exists = "append"
+
+    if not totals:
+        raise ValueError("CSV contained no rows to load")
+    write.redeclare_widened()
+    totals["state_turnout"] = _summarise_turnout(totals["state_turnout"])
+    for name in [
+        "seat_cube",
+        "state_turnout",
+        "gender_representation",
+        "party_vote_share",
+    ]:
+        write(name, totals[name])
+    write(MANIFEST_TABLE, _manifest_frame(hashers))
+    write.write_dimensions()
+
+
+def _write_tables_incremental(
+    df: pd.DataFrame, engine, write: TableWriter
+) -> Optional[Set[Tuple[int, str]]]:
+    """Rewrite only the (year, state) partitions whose content hash changed.
+
+    Returns the partitions that were rewritten or removed, with party_year_delta
+    and the search index brought up to date for them. Returns None after falling
+    back to a full load, when the database has no manifest yet.
+    """
+    stored = _read_manifest(engine)
+    hashers = _update_partition_hashes({}, df)
+    if not stored:
+        _write_tables(df, write)
+        return None
+
+    current = {key: hasher.hexdigest() for key, (hasher, _) in hashers.items()}
+    changed = {key for key, digest in current.items() if stored.get(key) != digest}
+    dirty = changed | (set(stored) - set(current))
+    if not dirty:
+        return dirty
+
+    mask = np.zeros(len(df), dtype=bool)
+    partitions = df.groupby(PARTITION_KEYS, sort=False, observed=True).indices
+    for (year, state), positions in partitions.items():
+        mask[positions] = (int(year), state) in changed
+    part = df[mask]
+    years = sorted({year for year, _ in dirty})
+    year_rows = df[df["year"].isin(years)]
+    partitions = [{"year": year, "state_name": state} for year, state in sorted(dirty)]
+
+    with engine.begin() as conn:
+        search = _has_table(conn, SEARCH_TABLE)
+        if search:
+            # The index is contentless: removing a row takes the values it indexed.
+            conn.execute(
+                text(
+                    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, candidate_name, "
+                    f"constituency_name) SELECT 'delete', s.* FROM ({_SEARCH_ROWS} "
+                    "WHERE l.year = :year AND l.state_key = "
+                    "(SELECT state_key FROM dim_state WHERE state_name = :state_name)) AS s"
+                ),
+                partitions,
+            )
+        for table in PARTITIONED_TABLES + [MANIFEST_TABLE]:
+            conn.execute(text(f"DELETE FROM {table} WHERE {_partition_filter(table)}"), partitions)
+        # Appended rows get rowids above the highest remaining one.
+        last_rowid = conn.execute(text("SELECT COALESCE(MAX(rowid), 0) FROM candidate_lookup")).scalar()
+        for table in YEARLY_TABLES:
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE year = :year"),
+                [{"year": year} for year in years],
+            )
+
+        append = TableWriter(conn, write.encoder)
+        append("candidates", part, "append")
+        append("seat_cube", _seat_cube(part), "append")
+        append("state_turnout", _state_turnout(part), "append")
+        append("victory_margins", _victory_margins(part), "append")
+        append("candidate_lookup", _candidate_lookup(part), "append")
+        append("gender_representation", _gender_representation(year_rows), "append")
+        append("party_vote_share", _party_vote_share(year_rows), "append")
+        append(MANIFEST_TABLE, _manifest_frame({key: hashers[key] for key in changed}), "append")
+        append.write_dimensions()
+        if search:
+            conn.execute(
+                text(
+                    f"INSERT INTO {SEARCH_TABLE}(rowid, candidate_name, constituency_name) "
+                    f"{_SEARCH_ROWS} WHERE l.rowid > :last_rowid"
+                ),
+                {"last_rowid": last_rowid},
+            )
+        all_years = sorted({year for year, _ in current})
+        if _has_table(conn, "party_year_delta") and all_years == sorted({y for y, _ in stored}):
+            state_keys = set(
+                conn.execute(
+                    text("SELECT state_key FROM dim_state WHERE state_name IN :states").bindparams(
+                        bindparam("states", expanding=True)
+                    ),
+                    {"states": sorted({state for _, state in dirty})},
+                ).scalars()
+            )
+            _update_party_year_delta(conn, state_keys, set(years), all_years)
+        else:
+            # A new or vanished election year changes which elections are consecutive.
+            _create_party_year_delta(conn)
+        # Drop dimension values no longer referenced by any candidate.
+        for table, key in DIMENSIONS.values():
+            conn.execute(
+                text(f"DELETE FROM {table} WHERE {key} NOT IN (SELECT {key} FROM candidates)")
+            )
+    return dirty
+
+
+def load_database(
+    csv_path: Path = RAW_DATA,
+    db_path: Path = DB_PATH,
+    chunksize: Optional[int] = None,
+    incremental: bool = False,
+    bulk: bool = False,
+    profile_memory: bool = False,
+    parquet: bool = True,
+) -> Path:
+    if chunksize and incremental:
+        raise ValueError("Incremental loads cannot be combined with chunked streaming")
     engine = _create_engine(db_path)
-    _write_tables(df_clean, engine)
+    previous = _read_generation(engine) if incremental else None
+    dirty: Optional[Set[Tuple[int, str]]] = None
+    encoder = DimensionEncoder.from_database(engine) if incremental else DimensionEncoder()
+    writer = BulkWriter(db_path, encoder) if bulk else TableWriter(engine, encoder)
+    profiler = MemoryProfiler(profile_memory)
+    if chunksize:
+        with profiler.stage("stream_chunks"), writer:
+            _write_tables_chunked(_iter_raw_csv(csv_path, chunksize), writer)
+    else:
+        with profiler.stage("read_csv"):
+            df = _load_raw_csv(csv_path)
+        with profiler.stage("clean"):
+            df = _clean_dataframe(df)
+        with profiler.stage("write_tables"), writer:
+            if incremental:
+                dirty = _write_tables_incremental(df, engine, writer)
+                if dirty is not None:
+                    print(f"Rewrote {len(dirty)} changed (year, state) partitions")
+            else:
+                _write_tables(df, writer)
+    if dirty is not None and not dirty:
+        # Nothing changed: keep the generation, so API caches and ETags stay valid.
+        print(f"Database unchanged; keeping load generation {previous}")
+        return db_path
+    # Indexes are built once the data is in place rather than maintained per row;
+    # an incremental load has already updated party_year_delta and the search index.
+    with profiler.stage("indexes"):
+        _create_indexes_and_views(engine, rebuild=dirty is None)
+        with engine.connect() as conn:
+            search = _has_table(conn, SEARCH_TABLE)
+        if dirty is None or not search:
+            _create_search_index(engine)
+    generation = _write_load_metadata(engine)
+    if parquet:
+        directory = parquet_path(db_path)
+        stamp = directory / "generation"
+        # Only the rewritten years, when the copy on disk matches the previous load.
+        current = dirty is not None and stamp.exists() and stamp.read_text() == previous
+        with profiler.stage("parquet"):
+            write_parquet(engine, directory, generation, {y for y, _ in dirty} if current else None)
+    if writer.stats:
+        print(writer.report())
+    if profiler.stages:
+        print(profiler.report())
     return db_path
 
 
@@ -255,9 +1304,57 @@ def main():
         default=DB_PATH,
         help="Path to the SQLite database to create",
     )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the CSV in chunks of this many rows to bound peak memory",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite (year, state) partitions whose content changed since the last load",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Write tables through a single unjournaled sqlite3 transaction instead of to_sql",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Print per-stage and peak memory traced with tracemalloc",
+    )
+    parser.add_argument(
+        "--no-parquet",
+        action="store_true",
+        help="Skip the year-partitioned Parquet copy read by the DuckDB engine",
+    )
+    parser.add_argument(
+        "--parquet-only",
+        action="store_true",
+        help="Only rewrite the Parquet copy of an existing database",
+    )
     args = parser.parse_args()
 
-    path = load_database(args.csv, args.db)
+    if args.parquet_only:
+        engine = _create_engine(args.db)
+        generation = _read_generation(engine)
+        if generation is None:
+            raise SystemExit(f"{args.db} has no load generation; reload it to write Parquet")
+        path = write_parquet(engine, parquet_path(args.db), generation)
+        print(f"Parquet copy written to {path}")
+        return
+
+    path = load_database(
+        args.csv,
+        args.db,
+        chunksize=args.chunksize,
+        incremental=args.incremental,
+        bulk=args.bulk,
+        profile_memory=args.profile_memory,
+        parquet=not args.no_parquet,
+    )
     print(f"Database created at {path}")
 
 
@@ -0,0 +1,108 @@
+"""Summarise the slow-query log into the statements worth looking at first.
+
+Reads the JSON lines written when ``ELECTIONS_SLOW_QUERY_MS`` is set, including
+rotated files, groups them by fingerprint (the SQL with literals and parameter
+lists collapsed) and prints the top groups with the plan of their slowest run::
+
+    python backend/scripts/slow_query_report.py --top 10 --sort total
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.app.config import SLOW_QUERY_LOG  # noqa: E402
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+SORT_KEYS = {
+    "total": lambda group: group["total_ms"],
+    "count": lambda group: group["count"],
+    "max": lambda group: group["max_ms"],
+    "mean": lambda group: group["total_ms"] / group["count"],
+}
+
+
+def fingerprint(sql: str) -> str:
+    """``sql`` with literals as ``?`` and ``IN`` lists of any length as ``(?+)``."""
+    normalised = _STRINGS.sub("?", sql)
+    normalised = _NUMBERS.sub("?", normalised)
+    normalised = _SPACE.sub(" ", normalised).strip()
+    return _LISTS.sub("(?+)", normalised)
+
+
+def _log_files(path: Path) -> List[Path]:
+    rotated = sorted(path.parent.glob(f"{path.name}.*"), key=lambda p: p.suffix, reverse=True)
+    return [p for p in rotated if p.suffix[1:].isdigit()] + ([path] if path.exists() else [])
+
+
+def _records(paths: List[Path]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with path.open(encoding="utf-8") as lines:
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarise(records: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    groups: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        sql = fingerprint(record["sql"])
+        group = groups.setdefault(
+            sql,
+            {"sql": sql, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "queries": set(), "slowest": None},
+        )
+        duration = record["duration_ms"]
+        group["count"] += 1
+        group["total_ms"] += duration
+        group["queries"].add(record.get("query", "other"))
+        if duration >= group["max_ms"]:
+            group["max_ms"] = duration
+            group["slowest"] = record
+    return list(groups.values())
+
+
+def _print(groups: List[Dict[str, Any]]) -> None:
+    for rank, group in enumerate(groups, 1):
+        digest = hashlib.sha1(group["sql"].encode()).hexdigest()[:10]
+        slowest = group["slowest"]
+        print(
+            f"#{rank} {digest} [{', '.join(sorted(group['queries']))}] "
+            f"count={group['count']} total={group['total_ms']:.1f}ms "
+            f"mean={group['total_ms'] / group['count']:.1f}ms max={group['max_ms']:.1f}ms"
+        )
+        print(f"  {group['sql']}")
+        print(f"  slowest at {slowest['time']} with {slowest['parameters']}")
+        for node in slowest.get("plan", []):
+            print(f"    {node['detail']}")
+        if "plan_error" in slowest:
+            print(f"    (no plan: {slowest['plan_error']})")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top slow statements by fingerprint.")
+    parser.add_argument("--log", type=Path, default=SLOW_QUERY_LOG, help="Slow-query log (rotated files are read too)")
+    parser.add_argument("--top", type=int, default=10, help="Number of fingerprints to show")
+    parser.add_argument("--sort", choices=sorted(SORT_KEYS), default="total", help="Rank fingerprints by")
+    args = parser.parse_args()
+    paths = _log_files(args.log)
+    if not paths:
+        sys.exit(f"No slow-query log at {args.log}")
+    groups = sorted(summarise(_records(paths)), key=SORT_KEYS[args.sort], reverse=True)
+    _print(groups[: args.top])
+
+
+if __name__ == "__main__":
+    main()
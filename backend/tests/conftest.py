@@ -0,0 +1,135 @@
+"""Fixtures shared by the test suite: a small Lok Dhaba-shaped CSV, loaded once.
+
+The CSV is generated rather than checked in. It has the quirks the loader and the
+API must handle: winners with a NULL margin, blank flag cells, and a text column
+(``Last_Party``) that is empty in its first rows and filled in its last ones.
+"""
+from __future__ import annotations
+
+import csv
+import random
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.app import main  # noqa: E402
+from backend.app.cache import query_cache  # noqa: E402
+from backend.app.database import (  # noqa: E402
+    ExportSession,
+    ReadOnlySession,
+    create_readonly_engine,
+)
+from backend.scripts.load_data import COLUMN_MAP, load_database  # noqa: E402
+
+STATES = ["Kerala", "Goa", "Bihar", "Tamil_Nadu"]
+YEARS = [2009, 2014, 2019]
+SEATS_PER_STATE = 8
+PARTIES = [("INC", "National Party"), ("BJP", "National Party"), ("DMK", "State-based Party")]
+SURNAMES = ["Singh", "Nair", "Kumar", "Pillai", "Das"]
+# Rows at the end of the file that name a last party; the rest leave it blank.
+LAST_PARTY_ROWS = 50
+CHUNK_ROWS = 100
+
+
+def write_csv(path: Path, seed: int = 7) -> Path:
+    rng = random.Random(seed)
+    rows = []
+    for year in YEARS:
+        for state in STATES:
+            for seat in range(1, SEATS_PER_STATE + 1):
+                votes = sorted((rng.randint(1_000, 90_000) for _ in range(4)), reverse=True)
+                electors = 200_000 + 1_000 * seat
+                for position, vote in enumerate(votes, start=1):
+                    party, party_type = (
+                        PARTIES[(seat + position + year) % len(PARTIES)] if position < 4 else ("IND", "")
+                    )
+                    winner = position == 1
+                    row = dict.fromkeys(COLUMN_MAP, "")
+                    row.update(
+                        State_Name=state,
+                        Assembly_No=year - 1950,
+                        Constituency_No=seat,
+                        Year=year,
+                        month=5,
+                        Poll_No=0,
+                        DelimID=4,
+                        Position=position,
+                        Candidate=f"{rng.choice('ABCDEFGH')}. {rng.choice(SURNAMES)}",
+                        Sex="F" if (seat + position) % 3 == 0 else "M",
+                        Party=party,
+                        Votes=vote,
+                        Candidate_Type="GEN",
+                        Valid_Votes=sum(votes),
+                        Electors=electors,
+                        Constituency_Name=f"{state.replace('_', ' ')} Seat {seat}",
+                        Constituency_Type="SC" if seat % 4 == 0 else "GEN",
+                        N_Cand=len(votes),
+                        Turnout_Percentage=round(sum(votes) * 100 / electors, 2),
+                        Vote_Share_Percentage=round(vote * 100 / sum(votes), 2),
+                        Deposit_Lost="no" if position < 3 else "yes",
+                        # Every seventh winner has no recorded margin.
+                        Margin="" if not winner or seat % 7 == 0 else vote - votes[1],
+                        Party_Type_TCPD=party_type,
+                        Turncoat="" if seat % 5 == 0 else rng.choice(["TRUE", "FALSE"]),
+                        Incumbent=rng.choice(["TRUE", "FALSE"]),
+                        MyNeta_education=rng.choice(["Graduate", "12th Pass"]),
+                        Election_Type="GE",
+                    )
+                    rows.append(row)
+    for row in rows[-LAST_PARTY_ROWS:]:
+        row["Last_Party"] = "INC"
+    with path.open("w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(COLUMN_MAP))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def bind(db_path: Path) -> None:
+    """Point the API's read-only and export sessions at ``db_path``."""
+    ReadOnlySession.configure(bind=create_readonly_engine(db_path))
+    ExportSession.configure(bind=create_readonly_engine(db_path, pool_size=2))
+    query_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def csv_path(tmp_path_factory) -> Path:
+    return write_csv(tmp_path_factory.mktemp("csv") / "All_States_GE.csv")
+
+
+@pytest.fixture(scope="session")
+def database(csv_path, tmp_path_factory) -> Path:
+    """A full load of ``csv_path``, Parquet copy included when pyarrow is installed."""
+    return load_database(csv_path, tmp_path_factory.mktemp("full") / "elections.db")
+
+
+@pytest.fixture(scope="session")
+def chunked_database(csv_path, tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("chunked") / "elections.db"
+    return load_database(csv_path, path, chunksize=CHUNK_ROWS, parquet=False)
+
+
+@pytest.fixture
+def api(database) -> Iterator[Path]:
+    """The API's sessions bound to the full load."""
+    bind(database)
+    yield database
+
+
+@pytest.fixture
+def db(api) -> Iterator[Session]:
+    with ReadOnlySession() as session:
+        yield session
+
+
+@pytest.fixture
+def client(api) -> TestClient:
+    """The API without its lifespan, so no index or pool is built up front."""
+    return TestClient(main.app)
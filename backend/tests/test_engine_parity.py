@@ -0,0 +1,175 @@
+"""Each alternative query engine returns what the SQL queries return.
+
+Calls every function the engine module implements itself (``columnar.py`` for
+``numpy``, ``duckdb_engine.py`` for ``duckdb``) with each combination of its
+optional filters, uncached, through both it and ``queries.py``, and compares the
+rows in order. Paginated queries are also walked page by page with the cursors
+each engine issues.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend.app import columnar, duckdb_engine, queries
+from backend.app.database import ReadOnlySession
+from backend.app.pagination import decode_cursor, split_page
+
+ENGINES = {"numpy": columnar, "duckdb": duckdb_engine}
+
+# Function -> (required arguments, optional filters, sort key when paginated).
+FUNCTIONS: Dict[str, Tuple[Dict[str, Any], List[str], Optional[Any]]] = {
+    "party_seat_share": ({}, ["year", "state", "parties", "gender"], queries.SEAT_SHARE_KEY),
+    "state_turnout": ({}, ["year", "state"], queries.TURNOUT_KEY),
+    "gender_representation": ({}, ["year"], None),
+    "top_vote_share": ({"year": None, "limit": 1000}, [], None),
+    "margin_distribution": ({}, ["year", "state", "constituency"], queries.MARGIN_KEY),
+    "highest_turnout": ({}, [], None),
+    "women_participation": ({}, [], None),
+    "closest_margins": ({"limit": 50}, [], None),
+    "vote_share_trend": ({}, [], None),
+    "education_win_rate": ({}, [], None),
+}
+# Small enough that the fixture database spans several pages.
+PAGE_SIZE = 20
+
+
+@pytest.fixture(scope="module")
+def sample(database) -> Dict[str, Any]:
+    with Session(create_engine(f"sqlite:///{database}")) as db:
+        return _sample_values(db)
+
+
+def _sample_values(db: Session) -> Dict[str, Any]:
+    row = db.execute(
+        text(
+            "SELECT m.year, s.state_name, c.constituency_name, p.party FROM victory_margins AS m "
+            "JOIN dim_state AS s ON s.state_key = m.state_key "
+            "JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key "
+            "JOIN dim_party AS p ON p.party_key = m.party_key "
+            "ORDER BY m.year DESC LIMIT 1"
+        )
+    ).one()
+    other = db.execute(
+        text(
+            "SELECT m.year, s.state_name, c.constituency_name FROM victory_margins AS m "
+            "JOIN dim_state AS s ON s.state_key = m.state_key "
+            "JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key "
+            "WHERE m.year < :year AND s.state_name <> :state ORDER BY m.year DESC LIMIT 1"
+        ),
+        {"year": row.year, "state": row.state_name},
+    ).one()
+    return {
+        "year": row.year,
+        "state": row.state_name,
+        "constituency": row.constituency_name,
+        "parties": [row.party, "IND", "No Such Party"],
+        "gender": "F",
+        # Several values of each filter, unknown ones included.
+        "multi": {
+            "year": [row.year, other.year, 1800],
+            "state": [row.state_name, other.state_name],
+            "constituency": [row.constituency_name, other.constituency_name, "No Such Seat"],
+            "parties": [row.party, "IND"],
+            "gender": ["F", "M"],
+        },
+    }
+
+
+def _calls(sample: Dict[str, Any], module: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for name, (required, optional, _) in FUNCTIONS.items():
+        if getattr(module, name).__module__ != module.__name__:
+            continue  # re-exported from queries.py
+        base = {key: sample[key] if value is None else value for key, value in required.items()}
+        for size in range(len(optional) + 1):
+            for combo in itertools.combinations(optional, size):
+                yield name, {**base, **{key: sample[key] for key in combo}}
+        for key in optional:
+            yield name, {**base, key: sample["multi"][key]}
+        if len(optional) > 1:
+            yield name, {**base, **{key: sample["multi"][key] for key in optional}}
+
+
+def _plain(result: Any) -> Any:
+    if result is None:
+        return None
+    if isinstance(result, list):
+        return [dict(row) for row in result]
+    return dict(result)
+
+
+def _same(expected: Any, actual: Any) -> bool:
+    if isinstance(expected, float) or isinstance(actual, float):
+        if expected is None or actual is None:
+            return expected is actual
+        return math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-9)
+    return type(expected) is type(actual) and expected == actual
+
+
+def _differences(expected: Any, actual: Any) -> Iterator[str]:
+    if expected is None or actual is None:
+        if expected is not actual:
+            yield f"{expected!r} != {actual!r}"
+        return
+    rows = [(expected, actual)] if isinstance(expected, dict) else list(zip(expected, actual))
+    if not isinstance(expected, dict) and len(expected) != len(actual):
+        yield f"{len(expected)} rows != {len(actual)}"
+    for index, (left, right) in enumerate(rows):
+        if set(left) != set(right):
+            yield f"[{index}] keys {sorted(left)} != {sorted(right)}"
+            continue
+        for key in left:
+            if not _same(left[key], right[key]):
+                yield f"[{index}].{key}: {left[key]!r} != {right[key]!r}"
+
+
+def _run(func: Callable, db: Session, params: Dict[str, Any]) -> Any:
+    return _plain(func.__wrapped__(db, **params))
+
+
+def _pages(func: Callable, db: Session, params: Dict[str, Any], key) -> Iterator[Any]:
+    cursor = None
+    while True:
+        after = decode_cursor(cursor, key) if cursor else None
+        rows = _run(func, db, {**params, "limit": PAGE_SIZE, "after": after})
+        rows, cursor = split_page(rows, PAGE_SIZE, key)
+        yield rows
+        if cursor is None:
+            return
+
+
+@pytest.fixture
+def engine_module(api, database, request, monkeypatch):
+    module = ENGINES[request.param]
+    if module is duckdb_engine:
+        monkeypatch.setattr(duckdb_engine, "parquet_dir", database.with_suffix(".parquet"))
+        reason = duckdb_engine._unavailable()
+        if reason:
+            # Otherwise every call would fall back to SQL and trivially match.
+            pytest.skip(f"DuckDB engine unavailable: {reason}")
+    return module
+
+
+@pytest.mark.parametrize("engine_module", sorted(ENGINES), indirect=True)
+def test_engine_matches_sql(engine_module, sample):
+    failures = []
+    with ReadOnlySession() as db:
+        for name, params in _calls(sample, engine_module):
+            sql, other = getattr(queries, name), getattr(engine_module, name)
+            comparisons = [(_run(sql, db, params), _run(other, db, params))]
+            key = FUNCTIONS[name][2]
+            if key is not None:
+                comparisons += itertools.zip_longest(
+                    _pages(sql, db, params, key), _pages(other, db, params, key)
+                )
+            for page, (expected, actual) in enumerate(comparisons):
+                problems = list(itertools.islice(_differences(expected, actual), 5))
+                if problems:
+                    where = "all rows" if page == 0 else f"page {page}"
+                    failures.append(f"{name} {params} ({where}): {'; '.join(problems)}")
+    assert not failures, "\n".join(failures)
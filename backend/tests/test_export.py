@@ -0,0 +1,42 @@
+"""Arrow exports type each column by the values it holds.
+
+A chunked load can declare a column FLOAT while later chunks store text in it,
+so the declared SQLite type cannot pick the Arrow type.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import main
+
+from .conftest import LAST_PARTY_ROWS, bind
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _arrow_export(client: TestClient, **params) -> "pa.Table":
+    response = client.get("/export/candidates", params={"format": "arrow", **params})
+    assert response.status_code == 200
+    return pa.ipc.open_stream(response.content).read_all()
+
+
+@pytest.mark.parametrize("fixture", ["database", "chunked_database"])
+def test_arrow_export_of_text_in_any_column(request, fixture):
+    path = request.getfixturevalue(fixture)
+    bind(path)
+    table = _arrow_export(TestClient(main.app))
+    with sqlite3.connect(path) as conn:
+        assert table.num_rows == conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    assert table.schema.field("last_party").type == pa.string()
+    assert table.column("last_party").to_pylist().count("INC") == LAST_PARTY_ROWS
+
+
+def test_arrow_export_keeps_numeric_types(client):
+    table = _arrow_export(client, year=2019)
+    assert table.schema.field("votes").type == pa.int64()
+    assert table.schema.field("turnout_pct").type == pa.float64()
+    assert table.schema.field("is_winner").type == pa.bool_()
+    assert table.schema.field("state_name").type == pa.string()
@@ -0,0 +1,18 @@
+"""``/filters`` narrows each facet by the other one only."""
+from __future__ import annotations
+
+from .conftest import STATES, YEARS
+
+
+def test_disjoint_state_and_year_keep_their_facets(client):
+    data = client.get("/filters", params={"state": "Goa", "year": 1998}).json()
+    assert data["years"] == YEARS
+    assert data["states"] == []
+    assert data["parties"] == data["constituencies"] == []
+
+
+def test_year_does_not_narrow_itself(client):
+    data = client.get("/filters", params={"state": "Goa", "year": YEARS[0]}).json()
+    assert data["years"] == YEARS
+    assert data["states"] == sorted(state.replace("_", " ").title() for state in STATES)
+    assert data["constituencies"] and all(name.startswith("Goa ") for name in data["constituencies"])
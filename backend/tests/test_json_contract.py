@@ -0,0 +1,111 @@
+"""The orjson fast path returns what the documented response models return.
+
+Requests every list endpoint that ``ELECTIONS_FAST_JSON`` switches over, with each
+combination of its optional filters, once through the Pydantic models and once
+through ``serialization.encode_rows``, and compares the decoded bodies including
+the JSON type of every value (``1`` and ``1.0`` differ).
+"""
+from __future__ import annotations
+
+import itertools
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend.app import main as api
+from backend.app.cache import query_cache
+
+# Endpoint -> (required params, optional filters).
+ENDPOINTS: Dict[str, Tuple[Dict[str, Any], List[str]]] = {
+    "/party-seat-share": ({}, ["year", "state", "parties", "gender"]),
+    "/state-turnout": ({}, ["year", "state"]),
+    "/gender-representation": ({}, ["year"]),
+    "/top-vote-share": ({"year": None}, []),
+    "/margin-distribution": ({}, ["year", "state", "constituency"]),
+    "/search": ({"query": "sing"}, ["year", "state", "party", "gender"]),
+    "/analytics/top-gainers": ({}, ["year", "state"]),
+    "/analytics/top-losers": ({}, ["year", "state"]),
+    "/analytics/close-margins": ({}, []),
+    "/analytics/vote-share-trend": ({}, []),
+    "/analytics/education-win-rate": ({}, []),
+}
+
+
+@pytest.fixture(scope="module")
+def sample(database) -> Dict[str, Any]:
+    with create_engine(f"sqlite:///{database}").connect() as conn:
+        row = conn.execute(
+            text(
+                "SELECT m.year, s.state_name, c.constituency_name, p.party FROM victory_margins AS m "
+                "JOIN dim_state AS s ON s.state_key = m.state_key "
+                "JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key "
+                "JOIN dim_party AS p ON p.party_key = m.party_key "
+                "ORDER BY m.year DESC LIMIT 1"
+            )
+        ).one()
+        previous = conn.execute(
+            text("SELECT MAX(year) FROM victory_margins WHERE year < :year"), {"year": row.year}
+        ).scalar()
+    return {
+        "year": row.year,
+        "state": row.state_name,
+        "constituency": row.constituency_name,
+        "parties": [row.party],
+        "party": row.party,
+        "gender": "F",
+        # Repeated query parameters, e.g. ?year=2019&year=2014.
+        "multi": {
+            "year": [row.year, previous],
+            "state": [row.state_name, "No Such State"],
+            "constituency": [row.constituency_name, "No Such Seat"],
+            "parties": [row.party, "IND"],
+            "party": [row.party, "IND"],
+            "gender": ["F", "M"],
+        },
+    }
+
+
+def _requests(sample: Dict[str, Any], path: str) -> Iterator[Dict[str, Any]]:
+    required, optional = ENDPOINTS[path]
+    base = {key: sample[key] if value is None else value for key, value in required.items()}
+    for size in range(len(optional) + 1):
+        for combo in itertools.combinations(optional, size):
+            yield {**base, **{key: sample[key] for key in combo}}
+    if optional:
+        yield {**base, **{key: sample["multi"][key] for key in optional}}
+
+
+def _differences(expected: Any, actual: Any, where: str = "$") -> Iterator[str]:
+    if type(expected) is not type(actual):
+        yield f"{where}: {expected!r} ({type(expected).__name__}) != {actual!r} ({type(actual).__name__})"
+    elif isinstance(expected, dict):
+        if list(expected) != list(actual):
+            yield f"{where}: keys {list(expected)} != {list(actual)}"
+        for key in expected.keys() & actual.keys():
+            yield from _differences(expected[key], actual[key], f"{where}.{key}")
+    elif isinstance(expected, list):
+        if len(expected) != len(actual):
+            yield f"{where}: {len(expected)} rows != {len(actual)}"
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            yield from _differences(left, right, f"{where}[{index}]")
+    elif expected != actual:
+        yield f"{where}: {expected!r} != {actual!r}"
+
+
+@pytest.mark.parametrize("path", list(ENDPOINTS))
+def test_fast_json_matches_response_models(client, sample, monkeypatch, path):
+    failures = []
+    for params in _requests(sample, path):
+        bodies = []
+        for fast in (False, True):
+            monkeypatch.setattr(api, "FAST_JSON", fast)
+            query_cache.clear()
+            response = client.get(path, params=params)
+            assert response.status_code == 200, (params, response.text)
+            bodies.append(json.loads(response.content))
+        problems = list(itertools.islice(_differences(*bodies), 5))
+        if problems:
+            failures.append(f"{params}: {'; '.join(problems)}")
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,37 @@
+"""A chunked load must declare the same column types as a full load of the same CSV.
+
+The conftest CSV leaves ``Last_Party`` blank in its first chunks, so the first
+chunk alone would read it as a float column.
+"""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+from backend.scripts.load_data import load_database
+
+from .conftest import CHUNK_ROWS
+
+
+def _schema(db_path: Path) -> Dict[str, List[Tuple[str, str]]]:
+    with sqlite3.connect(db_path) as conn:
+        tables = [
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+        ]
+        return {
+            table: [(row[1], row[2]) for row in conn.execute(f'PRAGMA table_info("{table}")')]
+            for table in tables
+        }
+
+
+@pytest.mark.parametrize("bulk", [False, True], ids=["to_sql", "bulk"])
+def test_chunked_load_declares_full_load_types(csv_path, tmp_path, bulk):
+    full = load_database(csv_path, tmp_path / "full.db", bulk=bulk, parquet=False)
+    chunked = load_database(
+        csv_path, tmp_path / "chunked.db", chunksize=CHUNK_ROWS, bulk=bulk, parquet=False
+    )
+    assert _schema(chunked) == _schema(full)
@@ -0,0 +1,54 @@
+"""The dashboard's margin histogram agrees with the margin index.
+
+``/dashboard`` builds its histogram from ``margin_distribution`` rows whenever a
+constituency or several years or states are selected, and from the pre-sorted
+``MarginIndex`` otherwise. Both must give the same margins for every slice, with
+NULL margins left out.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.app import dashboard, queries
+from backend.app.margins import margin_index, sorted_margins
+
+NULL_ROW = {"margin": None}
+
+
+def _slices(db: Session) -> Iterator[Tuple[Optional[int], Optional[str]]]:
+    yield None, None
+    rows = db.execute(
+        text(
+            "SELECT DISTINCT m.year, s.state_name FROM victory_margins AS m "
+            "JOIN dim_state AS s ON s.state_key = m.state_key ORDER BY m.year, s.state_name"
+        )
+    ).all()
+    yield from ((year, None) for year in sorted({year for year, _ in rows}))
+    yield from ((None, state) for state in sorted({state for _, state in rows}))
+    yield from rows
+
+
+def test_query_rows_match_index(db):
+    index = margin_index(db)
+    for year, state in _slices(db):
+        rows = list(queries.margin_distribution.__wrapped__(db, year, state))
+        # An extra NULL-margin row, whether or not the slice already has one.
+        margins = sorted_margins(rows + [NULL_ROW])
+        assert np.array_equal(margins, index.lookup(year, state)), (year, state)
+
+
+def test_histogram_of_seat_with_null_margin(db):
+    row = db.execute(
+        text(
+            "SELECT m.year, c.constituency_name FROM victory_margins AS m "
+            "JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key "
+            "WHERE m.margin IS NULL LIMIT 1"
+        )
+    ).one()
+    # The constituency filter takes the query-rows path.
+    bins = dashboard._margin_histogram(db, year=row.year, constituency=row.constituency_name)
+    assert sum(item["count"] for item in bins) == 0
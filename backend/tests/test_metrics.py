@@ -0,0 +1,27 @@
+"""Request metrics are labelled by route template, revalidations included.
+
+``conditional_get`` answers a matching ``If-None-Match`` with a 304 before the
+request is routed, so the template has to be matched from the router.
+"""
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def _count(client: TestClient, route: str, status: int) -> float:
+    labels = f'route="{route}",method="GET",status="{status}"'
+    series = f"elections_http_request_duration_seconds_count{{{labels}}}"
+    for line in client.get("/metrics").text.splitlines():
+        name, _, value = line.rpartition(" ")
+        if name == series:
+            return float(value)
+    return 0.0
+
+
+def test_revalidations_are_counted_under_their_route(client):
+    etag = client.get("/state-turnout", params={"year": 2014}).headers["ETag"]
+    before = _count(client, "/state-turnout", 304)
+    response = client.get("/state-turnout", params={"year": 2014}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert _count(client, "/state-turnout", 304) == before + 1
+    assert _count(client, "unmatched", 304) == 0
@@ -0,0 +1,59 @@
+"""A (year, state) partition's hash depends on its own rows only.
+
+``--incremental`` rewrites the partitions whose manifest hash changed. Blanking
+the ``Votes`` and a flag cell of one row changes the dtypes the cleaner infers for
+the whole frame; only that row's partition may hash differently, and a chunked
+load must write the same hashes as a full one.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+from backend.scripts.load_data import (
+    BOOL_COLS,
+    COLUMN_MAP,
+    _clean_dataframe,
+    _iter_raw_csv,
+    _load_raw_csv,
+    _update_partition_hashes,
+)
+
+from .conftest import CHUNK_ROWS
+
+FLAG_COLUMN = next(raw for raw, col in COLUMN_MAP.items() if col in BOOL_COLS)
+
+
+def _digests(frames: Iterable[pd.DataFrame]) -> Dict[Tuple[int, str], str]:
+    hashers: Dict = {}
+    for raw in frames:
+        _update_partition_hashes(hashers, _clean_dataframe(raw))
+    return {key: hasher.hexdigest() for key, (hasher, _) in hashers.items()}
+
+
+def _changed(
+    before: Dict[Tuple[int, str], str], after: Dict[Tuple[int, str], str]
+) -> List[Tuple[int, str]]:
+    return sorted(key for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+
+
+def _blank_one_row(csv_path: Path, edited_path: Path) -> Tuple[int, str]:
+    raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    cleaned = _clean_dataframe(_load_raw_csv(csv_path))
+    row = cleaned.index[cleaned["votes"].notna()][-1]
+    raw.loc[row, ["Votes", FLAG_COLUMN]] = ""
+    raw.to_csv(edited_path, index=False)
+    return int(cleaned.at[row, "year"]), cleaned.at[row, "state_name"]
+
+
+def test_chunked_load_hashes_like_full_load(csv_path):
+    full = _digests([_load_raw_csv(csv_path)])
+    assert _changed(full, _digests(_iter_raw_csv(csv_path, CHUNK_ROWS))) == []
+
+
+def test_editing_one_partition_changes_only_its_hash(csv_path, tmp_path):
+    full = _digests([_load_raw_csv(csv_path)])
+    partition = _blank_one_row(csv_path, tmp_path / "edited.csv")
+    assert _changed(full, _digests([_load_raw_csv(tmp_path / "edited.csv")])) == [partition]
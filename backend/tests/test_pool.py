@@ -0,0 +1,54 @@
+"""Serving mode compiles the hot statements on every pooled connection but runs
+them only once.
+"""
+from __future__ import annotations
+
+import gc
+import sqlite3
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import event
+
+from backend.app import main
+from backend.app.database import ReadOnlySession, _prepare, open_pool
+
+
+def _cached_statements() -> int:
+    return sum(type(obj).__name__ == "Statement" for obj in gc.get_objects())
+
+
+@pytest.fixture
+def executed(api) -> Iterator[List[str]]:
+    """Statements the API's read-only engine runs while the test does."""
+    engine = ReadOnlySession.kw["bind"]
+    statements: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", record)
+    yield statements
+    event.remove(engine, "after_cursor_execute", record)
+
+
+def test_prepare_caches_without_running():
+    calls = []
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("touch", 0, lambda: calls.append(1) or 1)
+    _prepare(conn, [("SELECT touch()", ())])
+    assert calls == []
+    cached = _cached_statements()
+    assert conn.execute("SELECT touch()").fetchone() == (1,)
+    assert calls == [1]
+    assert _cached_statements() == cached
+
+
+def test_open_pool_runs_hot_queries_once(executed):
+    with ReadOnlySession() as db:
+        main._warm_statements(db)
+    hot = list(executed)
+    executed.clear()
+    connections = open_pool(main._warm_statements)
+    assert connections == ReadOnlySession.kw["bind"].pool.size() > 1
+    assert [statement for statement in executed if "sqlite_master" not in statement] == hot
@@ -0,0 +1,276 @@
+"""Every API query keeps using an index.
+
+Runs every function in ``backend.app.queries`` against the fixture database with
+each combination of its optional filters, captures the SQL it issues and checks
+``EXPLAIN QUERY PLAN`` for full table scans and temp B-trees. It also checks that
+multi-value filters render a bounded number of statement texts, so SQLite's
+statement cache keeps up. Run after changing a query or the indexes in
+``load_data.py``.
+"""
+from __future__ import annotations
+
+import inspect
+import itertools
+import re
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from backend.app import queries
+from backend.app.config import SQLITE_CACHED_STATEMENTS
+from backend.app.filters import bucket
+
+# Plan steps that are expected, keyed by query function. Anything else that scans
+# a table or sorts through a temp B-tree is reported.
+ALLOWED_STEPS: Dict[str, Dict[str, str]] = {
+    "education_win_rate": {
+        "USE TEMP B-TREE FOR ORDER BY": "ordered by the computed win rate",
+    },
+    "vote_share_trend": {
+        "USE TEMP B-TREE FOR GROUP BY": "re-groups the few per-category rows of each year",
+        "USE TEMP B-TREE FOR ORDER BY": "orders the joined per-category rows",
+    },
+    "margin_distribution": {
+        "USE TEMP B-TREE FOR RIGHT PART OF ORDER BY": "a constituency holds one winner per election",
+    },
+    "search_candidates": {
+        "SCAN l": "searches shorter than a trigram fall back to LIKE",
+        "USE TEMP B-TREE FOR ORDER BY": "bm25 ranking sorts the FTS matches only",
+    },
+}
+# Also expected when a filter holds several values.
+MULTI_VALUE_STEPS: Dict[str, str] = {
+    "USE TEMP B-TREE FOR GROUP BY": "seat cube rows of several genders are summed",
+    "USE TEMP B-TREE FOR ORDER BY": "rows from several index ranges are merged",
+    "USE TEMP B-TREE FOR RIGHT PART OF ORDER BY": "rows from several index ranges are merged",
+}
+# Filters whose statement count is checked over lists of 1..MAX_VALUES values.
+SHAPE_FILTERS = {
+    "party_seat_share": ["year", "state", "parties", "gender"],
+    "state_turnout": ["year", "state"],
+    "gender_representation": ["year"],
+    "margin_distribution": ["year", "state", "constituency"],
+    "search_candidates": ["year", "state", "party", "gender", "constituency"],
+    "top_gainers": ["state", "year"],
+}
+MAX_VALUES = 20
+
+SCAN = re.compile(r"^SCAN (\S+)(.*)$")
+SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)$")
+SOURCE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+AS)?(?:\s+(\w+))?", re.IGNORECASE)
+
+
+class Capture:
+    """A session on the database that records every statement it executes."""
+
+    def __init__(self, db_path):
+        self.engine = create_engine(f"sqlite:///{db_path}", future=True)
+        self.statements: List[Tuple[str, Any]] = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def run(self, db: Session, name: str, **kwargs) -> List[Tuple[str, Any]]:
+        """The statements ``queries.<name>`` issues, unwrapped so the cache cannot hide one."""
+        self.statements.clear()
+        inspect.unwrap(getattr(queries, name))(db, **kwargs)
+        return list(self.statements)
+
+
+@pytest.fixture(scope="module")
+def capture(database) -> Capture:
+    return Capture(database)
+
+
+@pytest.fixture(scope="module")
+def captured_db(capture) -> Iterator[Session]:
+    with Session(capture.engine) as session:
+        yield session
+
+
+@pytest.fixture(scope="module")
+def sample(captured_db) -> Dict[str, Any]:
+    db = captured_db
+    year = db.execute(text("SELECT MAX(year) FROM candidates")).scalar()
+    row = db.execute(
+        text(
+            "SELECT s.state_name, c.constituency_name FROM victory_margins AS m "
+            "JOIN dim_state AS s ON s.state_key = m.state_key "
+            "JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key "
+            "WHERE m.year = :year LIMIT 1"
+        ),
+        {"year": year},
+    ).one()
+    parties = db.execute(
+        text(
+            "SELECT p.party FROM candidates AS c JOIN dim_party AS p ON p.party_key = c.party_key "
+            "WHERE c.is_winner = 1 GROUP BY p.party ORDER BY COUNT(*) DESC LIMIT 2"
+        )
+    ).scalars().all()
+    other = db.execute(
+        text(
+            "SELECT m.year, s.state_name, c.constituency_name FROM victory_margins AS m "
+            "JOIN dim_state AS s ON s.state_key = m.state_key "
+            "JOIN dim_constituency AS c ON c.constituency_key = m.constituency_key "
+            "WHERE m.year < :year AND s.state_name <> :state_name LIMIT 1"
+        ),
+        {"year": year, "state_name": row.state_name},
+    ).one()
+    # A mid-table row of each paginated query, to request the page after it.
+    cursors = {}
+    for name, key in [
+        ("party_seat_share", queries.SEAT_SHARE_KEY),
+        ("state_turnout", queries.TURNOUT_KEY),
+        ("margin_distribution", queries.MARGIN_KEY),
+    ]:
+        rows = inspect.unwrap(getattr(queries, name))(db)
+        cursors[name] = tuple(rows[len(rows) // 2][column] for _, column, _ in key)
+    return {
+        "cursors": cursors,
+        "year": year,
+        "state": row.state_name,
+        "constituency": row.constituency_name,
+        "parties": list(parties),
+        "party": parties[0],
+        "gender": "F",
+        "multi": {
+            "year": [year, other.year],
+            "state": [row.state_name, other.state_name],
+            "constituency": [row.constituency_name, other.constituency_name],
+            "parties": list(parties),
+            "party": list(parties),
+            "gender": ["F", "M"],
+        },
+    }
+
+
+def _cases(sample: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    optional = {
+        "get_filters": ["state", "year"],
+        "party_seat_share": ["year", "state", "parties", "gender"],
+        "state_turnout": ["year", "state"],
+        "gender_representation": ["year"],
+        "margin_distribution": ["year", "state", "constituency"],
+        "search_candidates": ["year", "state", "party", "gender", "constituency"],
+        "top_gainers": ["state", "year"],
+        "top_losers": ["state", "year"],
+    }
+    required = {
+        "top_vote_share": [{"year": sample["year"]}],
+        "search_candidates": [{"query": "an"}, {"query": "sing"}],
+    }
+    for name, after in sample["cursors"].items():
+        required[name] = [{}, {"limit": 100, "after": after}]
+    for name in [
+        "get_filters",
+        "party_seat_share",
+        "state_turnout",
+        "gender_representation",
+        "top_vote_share",
+        "margin_distribution",
+        "search_candidates",
+        "highest_turnout",
+        "biggest_seat_change",
+        "top_gainers",
+        "top_losers",
+        "women_participation",
+        "closest_margins",
+        "vote_share_trend",
+        "education_win_rate",
+    ]:
+        filters = optional.get(name, [])
+        for base in required.get(name, [{}]):
+            for size in range(len(filters) + 1):
+                for combo in itertools.combinations(filters, size):
+                    kwargs = dict(base)
+                    kwargs.update({key: sample[key] for key in combo})
+                    yield name, kwargs
+            for key in filters:
+                yield name, {**base, **{k: sample[k] for k in filters}, key: sample["multi"][key]}
+            if filters:
+                yield name, {**base, **{key: sample["multi"][key] for key in filters}}
+
+
+def _shape_values(sample: Dict[str, Any], key: str, size: int) -> List[Any]:
+    """``size`` distinct values for filter ``key``, the sampled ones first."""
+    if key == "year":
+        unknown = [1000 + i for i in range(size)]
+    else:
+        unknown = [f"No Such {key.title()} {i}" for i in range(size)]
+    return (sample["multi"][key] + unknown)[:size]
+
+
+def _shape_statements(capture: Capture, db: Session, sample, name: str, key: str) -> Set[str]:
+    base = {"query": "sing"} if name == "search_candidates" else {}
+    texts = set()
+    for size in range(1, MAX_VALUES + 1):
+        values = _shape_values(sample, key, size)
+        texts |= {statement for statement, _ in capture.run(db, name, **base, **{key: values})}
+    return texts
+
+
+def _table_names(statement: str, tables: Set[str]) -> Dict[str, str]:
+    """Map the tables read by ``statement`` and their aliases to the table; CTEs are left out."""
+    names = {}
+    for table, alias in SOURCE.findall(statement):
+        if table in tables:
+            names.update({table: table, alias: table} if alias else {table: table})
+    return names
+
+
+def _violations(name: str, plan: List[str], tables: Dict[str, str], multi: bool) -> List[str]:
+    allowed = dict(ALLOWED_STEPS.get(name, {}), **(MULTI_VALUE_STEPS if multi else {}))
+    subqueries = {match.group(1) for match in map(SUBQUERY.match, plan) if match}
+    problems = []
+    for detail in plan:
+        if detail in allowed:
+            continue
+        scan = SCAN.match(detail)
+        if scan and "INDEX" not in scan.group(2) and scan.group(1) in tables:
+            if scan.group(1) in subqueries:
+                continue  # the rows a subquery materialised, not the table it read
+            if multi and tables[scan.group(1)].startswith("dim_"):
+                continue  # a long IN list can cost more probes than a small dimension has rows
+            problems.append(detail)
+        elif detail.startswith("USE TEMP B-TREE"):
+            problems.append(detail)
+    return problems
+
+
+def test_queries_use_indexes(capture, captured_db, sample):
+    raw = captured_db.connection().connection.driver_connection
+    tables = {row[0] for row in raw.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    failures = []
+    for name, kwargs in _cases(sample):
+        multi = any(isinstance(value, list) and len(value) > 1 for value in kwargs.values())
+        for statement, parameters in capture.run(captured_db, name, **kwargs):
+            plan = [row[3] for row in raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            problems = _violations(name, plan, _table_names(statement, tables), multi)
+            if problems:
+                label = f"{name}({', '.join(f'{k}={v!r}' for k, v in sorted(kwargs.items()))})"
+                failures.append(f"{label}: {'; '.join(problems)}")
+    assert not failures, "\n".join(failures)
+
+
+@pytest.mark.parametrize(
+    "name, key", [(name, key) for name, keys in SHAPE_FILTERS.items() for key in keys]
+)
+def test_multi_value_filters_share_statements(capture, captured_db, sample, name, key):
+    # Lists of every length from 1 to MAX_VALUES share one statement per bucket.
+    texts = _shape_statements(capture, captured_db, sample, name, key)
+    assert len(texts) <= len({bucket(size) for size in range(1, MAX_VALUES + 1)})
+
+
+def test_statements_fit_the_statement_cache(capture, captured_db, sample):
+    statements = {
+        statement
+        for name, kwargs in _cases(sample)
+        for statement, _ in capture.run(captured_db, name, **kwargs)
+    }
+    for name, keys in SHAPE_FILTERS.items():
+        for key in keys:
+            statements |= _shape_statements(capture, captured_db, sample, name, key)
+    assert len(statements) <= SQLITE_CACHED_STATEMENTS